@@ -0,0 +1,233 @@
+"""Benchmarks for reminders next date computation and calendar expansion.
+
+Usage:
+    python benchmarks/bench_reminder.py [--sizes 10 1000 10000]
+        [--save baseline.json] [--compare baseline.json] [--tolerance 0.25]
+
+Requires Home Assistant (and its dependencies) to be installed, reminders run
+against a minimal fake hass object.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components")
+)
+
+from reminder import SENSOR_CONFIG_SCHEMA  # noqa: E402
+from reminder.batch import BatchEngine  # noqa: E402
+from reminder.calendar import async_add_to_calendar  # noqa: E402
+from reminder.const import (  # noqa: E402
+    CALENDAR_PLATFORM,
+    CONF_EXECUTOR_THRESHOLD,
+    DEFAULT_CALENDAR,
+    DOMAIN,
+    DOMAIN_BATCH,
+    DOMAIN_CONFIG,
+    DOMAIN_SCHEDULER,
+    DOMAIN_STATS,
+    DOMAIN_TEMPLATES,
+    FREQUENCY_OPTIONS,
+    SENSOR_PLATFORM,
+)
+from reminder.scheduler import ReminderScheduler  # noqa: E402
+from reminder.sensor import (  # noqa: E402
+    ReminderSensor,
+    async_scheduled_update_reminders,
+    async_update_reminders,
+)
+from reminder.stats import ReminderStats  # noqa: E402
+from reminder.templates import SharedTemplates  # noqa: E402
+from reminder.tick import UpdateTick  # noqa: E402
+
+DEFAULT_SIZES = [10, 1000, 10000]
+WINDOWS = {
+    "1w": timedelta(weeks=1),
+    "1m": timedelta(days=31),
+    "1y": timedelta(days=365),
+    "10y": timedelta(days=3652),
+}
+# Calendar expansion paths, each forced by its threshold
+PATHS = {
+    "inline": {CONF_EXECUTOR_THRESHOLD: sys.maxsize},
+    "executor": {CONF_EXECUTOR_THRESHOLD: 1},
+}
+TODAY = date.today()
+RRULES = [
+    "FREQ=MONTHLY;BYDAY=1TU,3TU",
+    "FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH",
+    "FREQ=YEARLY;BYMONTH=11;BYDAY=4TH",
+]
+
+
+class FakeHass:
+    """Minimal hass object, enough to run reminders outside Home Assistant."""
+
+    def __init__(self):
+        self.data = {DOMAIN: {DOMAIN_CONFIG: {}}}
+        self.data[DOMAIN][DOMAIN_BATCH] = BatchEngine()
+        self.data[DOMAIN][DOMAIN_SCHEDULER] = ReminderScheduler(
+            self, lambda entities, tick: async_scheduled_update_reminders(self, entities, tick)
+        )
+        self.data[DOMAIN][DOMAIN_TEMPLATES] = SharedTemplates(self)
+        self.data[DOMAIN][DOMAIN_STATS] = ReminderStats()
+        self.data[DOMAIN][SENSOR_PLATFORM] = {}
+        self.data[DOMAIN][CALENDAR_PLATFORM] = {}
+
+    def async_create_task(self, target):
+        """Drop background tasks."""
+        target.close()
+
+    def async_add_executor_job(self, target, *args):
+        """Run job in the default executor."""
+        return asyncio.get_event_loop().run_in_executor(None, target, *args)
+
+
+def random_dates(rnd, count, spread):
+    """Returns dates around today, formatted for configuration."""
+    first = TODAY - timedelta(days=spread // 4)
+    if rnd.random() < 0.5:
+        # Consecutive days run, like a holidays period
+        start = first + timedelta(days=rnd.randrange(spread))
+        dates = [start + timedelta(days=i) for i in range(count)]
+    else:
+        dates = [first + timedelta(days=rnd.randrange(spread)) for _ in range(count)]
+    return [d.strftime("%Y-%m-%d") for d in dates]
+
+
+def random_config(rnd, index):
+    """Returns random reminder configuration."""
+    reminder_date = TODAY - timedelta(days=rnd.randrange(-60, 3 * 365))
+    config = {
+        "name": f"reminder {index}",
+        "frequency": rnd.choice(FREQUENCY_OPTIONS),
+        "period": rnd.choice([1, 1, 1, 2, 3, 4]),
+        "date": reminder_date.strftime("%Y-%m-%d"),
+    }
+    if rnd.random() < 0.1:
+        config["rrule"] = rnd.choice(RRULES)
+    if rnd.random() < 0.3:
+        config["exclude_dates"] = random_dates(rnd, rnd.choice([1, 10, 60]), 365)
+    if rnd.random() < 0.2:
+        config["include_dates"] = random_dates(rnd, rnd.choice([1, 10, 100]), 3 * 365)
+    if rnd.random() < 0.2:
+        config["first_date"] = (TODAY - timedelta(days=rnd.randrange(-90, 365))).strftime("%Y-%m-%d")
+    if rnd.random() < 0.2:
+        config["last_date"] = (TODAY + timedelta(days=rnd.randrange(-90, 5 * 365))).strftime("%Y-%m-%d")
+    if rnd.random() < 0.3:
+        config["start_time"] = "08:00"
+        config["end_time"] = "10:00"
+    return SENSOR_CONFIG_SCHEMA(config)
+
+
+def create_population(size, seed=0):
+    """Returns fake hass with a synthetic population of reminders."""
+    rnd = random.Random(seed)
+    hass = FakeHass()
+    sensors = []
+    for index in range(size):
+        sensor = ReminderSensor(hass, random_config(rnd, index))
+        sensor.hass = hass
+        hass.data[DOMAIN][SENSOR_PLATFORM][sensor.entity_id] = sensor
+        async_add_to_calendar(hass, sensor)
+        sensors.append(sensor)
+    return hass, sensors
+
+
+def measure(func, repeat):
+    """Returns median duration of func in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def run_size(size, repeat):
+    """Run all benchmarks on a population, returns results by benchmark name."""
+    hass, sensors = create_population(size)
+    calendar = hass.data[DOMAIN][CALENDAR_PLATFORM][DEFAULT_CALENDAR]
+    loop = asyncio.new_event_loop()
+    results = {}
+
+    def single_update():
+        for sensor in sensors[:10]:
+            loop.run_until_complete(sensor.async_update())
+
+    def population_update():
+        for sensor in sensors:
+            loop.run_until_complete(sensor.async_update())
+
+    def batch_update():
+        loop.run_until_complete(async_update_reminders(hass, sensors, UpdateTick()))
+
+    results["single_update"] = measure(single_update, repeat) / min(size, 10)
+    results["population_update"] = measure(population_update, max(1, repeat // 5))
+    results["batch_update"] = measure(batch_update, max(1, repeat // 5))
+    start = datetime.combine(TODAY, datetime.min.time())
+    for path, config in PATHS.items():
+        hass.data[DOMAIN][DOMAIN_CONFIG] = config
+        for name, window in WINDOWS.items():
+
+            def get_events(cold):
+                if cold:
+                    calendar.cache.clear()
+                loop.run_until_complete(calendar.async_get_events(hass, start, start + window))
+
+            rounds = max(1, repeat // 5)
+            results[f"calendar_{path}_{name}_cold"] = measure(lambda: get_events(True), rounds)
+            results[f"calendar_{path}_{name}_warm"] = measure(lambda: get_events(False), rounds)
+    loop.close()
+    return {f"{size}/{name}": value for name, value in results.items()}
+
+
+def compare(results, baseline, tolerance):
+    """Print comparison against baseline, returns True if no regression found."""
+    ok = True
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        ratio = value / baseline[name] if baseline[name] else 1.0
+        regression = ratio > 1 + tolerance
+        ok = ok and not regression
+        print(f"{name:32} {ratio:6.2f}x{'  REGRESSION' if regression else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--save", help="Save results as baseline file")
+    parser.add_argument("--compare", help="Compare results with baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        results.update(run_size(size, args.repeat))
+    for name, value in results.items():
+        print(f"{name:32} {value * 1000:10.3f} ms")
+
+    if args.save:
+        with open(args.save, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
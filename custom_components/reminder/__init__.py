@@ -1,26 +1,40 @@
 """Component to integrate with reminder."""
 
 from datetime import timedelta
+from functools import partial
 import logging
 
 import homeassistant.helpers.config_validation as cv
 import homeassistant.util.dt as dt_util
 
-from homeassistant import config_entries
-from homeassistant.const import ATTR_HIDDEN, ATTR_FRIENDLY_NAME, CONF_NAME, CONF_ICON
-
+from homeassistant import config as conf_util, config_entries
+from homeassistant.const import (
+    ATTR_HIDDEN,
+    ATTR_FRIENDLY_NAME,
+    CONF_NAME,
+    CONF_ICON,
+    EVENT_HOMEASSISTANT_STOP,
+    SERVICE_RELOAD,
+)
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import discovery
+from homeassistant.loader import async_get_integration
 
 import voluptuous as vol
 
 from .const import (
+    CALENDAR_PLATFORM,
+    CONF_CACHE_MONTHS,
     CONF_CALENDAR,
+    CONF_CURSOR,
     CONF_DATE,
     CONF_DATE_TEMPLATE,
     CONF_DATE_FORMAT,
     CONF_DESCRIPTION,
     CONF_ENABLED,
     CONF_EXCLUDE_DATES,
+    CONF_EXECUTOR_THRESHOLD,
     CONF_FIRST_DATE,
     CONF_FREQUENCY,
     CONF_FREQUENCY_TEMPLATE,
@@ -28,13 +42,20 @@ from .const import (
     CONF_ICON_ON,
     CONF_INCLUDE_DATES,
     CONF_LAST_DATE,
+    CONF_LIMIT,
     CONF_PERIOD,
     CONF_PERIOD_TEMPLATE,
     CONF_PREFIX,
+    CONF_PROCESS_THRESHOLD,
+    CONF_RRULE,
+    CONF_WEEKDAYS,
+    CONF_MONTHDAYS,
     CONF_SENSORS,
+    CONF_SLOWEST,
     CONF_SUMMARY,
     CONF_TAG,
     CONF_TIME,
+    CONF_START,
     CONF_START_TIME,
     CONF_END_TIME,
     CONF_TIME_FORMAT,
@@ -42,25 +63,72 @@ from .const import (
     DEFAULT_CALENDAR,
     DEFAULT_DATE_FORMAT,
     DEFAULT_ENABLED,
+    DEFAULT_EXECUTOR_THRESHOLD,
     DEFAULT_FREQUENCY,
     DEFAULT_ICON,
     DEFAULT_ICON_OFF,
     DEFAULT_ICON_ON,
+    DEFAULT_CACHE_MONTHS,
+    DEFAULT_LIMIT,
     DEFAULT_PERIOD,
+    DEFAULT_SLOWEST,
     DEFAULT_TAG,
     DEFAULT_TIME_FORMAT,
     DEFAULT_VERBOSE_FORMAT,
     DOMAIN,
+    DOMAIN_BATCH,
     DOMAIN_CONFIG,
+    DOMAIN_SCHEDULER,
+    DOMAIN_SNAPSHOT,
+    DOMAIN_STATS,
+    DOMAIN_TEMPLATES,
+    EVENT_STATS,
+    EVENT_UPCOMING,
     FREQUENCY_OPTIONS,
+    WEEKDAY_OPTIONS,
     SENSOR_PLATFORM,
+    SERVICE_GET_STATS,
+    SERVICE_LIST_UPCOMING,
 )
+from .batch import BatchEngine
+from .expand import list_upcoming
+from .ical import ReminderICalView
+from .recurrence import RRuleRecurrence
+from .scheduler import ReminderScheduler
+from .sensor import async_reload_reminders, async_scheduled_update_reminders
+from .snapshot import ReminderSnapshot
+from .stats import ReminderStats
+from .templates import SharedTemplates
+from .tick import UpdateTick
 
 MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=30)
 
 _LOGGER = logging.getLogger(__name__)
 
-SENSOR_CONFIG_SCHEMA = vol.Schema({
+
+def valid_rrule(value):
+    """Validate RRULE recurrence."""
+    value = cv.string(value)
+    try:
+        # Seek once, rules may only fail when looked up
+        today = dt_util.now().date()
+        recurrence = RRuleRecurrence(value, today)
+        recurrence.find_next_date(today)
+    except (ValueError, TypeError) as error:
+        raise vol.Invalid(f"Invalid rrule: {error}")
+    if recurrence.never_occurs:
+        raise vol.Invalid(f"Invalid rrule: {value} never occurs")
+    return value
+
+
+def rrule_has_date(config):
+    """Validate that RRULE recurrences have a start date."""
+    if CONF_RRULE in config and CONF_DATE not in config and CONF_DATE_TEMPLATE not in config:
+        raise vol.Invalid(f"{CONF_RRULE} requires {CONF_DATE} or {CONF_DATE_TEMPLATE}")
+    return config
+
+
+SENSOR_CONFIG_SCHEMA = vol.All(vol.Schema({
     vol.Required(CONF_NAME): cv.string,
     vol.Optional(ATTR_FRIENDLY_NAME): cv.string,
     vol.Optional(CONF_CALENDAR, default=DEFAULT_CALENDAR): cv.string,
@@ -78,8 +146,17 @@ SENSOR_CONFIG_SCHEMA = vol.Schema({
     vol.Optional(CONF_TIME_FORMAT, default=DEFAULT_TIME_FORMAT): cv.string,
     vol.Optional(CONF_FIRST_DATE): cv.string,
     vol.Optional(CONF_LAST_DATE): cv.string,
-    vol.Optional(CONF_PERIOD, default=DEFAULT_PERIOD): cv.positive_int,
+    vol.Optional(CONF_PERIOD, default=DEFAULT_PERIOD): vol.All(
+        vol.Coerce(int), vol.Range(min=1)
+    ),
     vol.Optional(CONF_PERIOD_TEMPLATE): cv.template,
+    vol.Optional(CONF_RRULE): valid_rrule,
+    vol.Optional(CONF_WEEKDAYS): vol.All(
+        cv.ensure_list, [vol.All(vol.Lower, vol.In(WEEKDAY_OPTIONS))]
+    ),
+    vol.Optional(CONF_MONTHDAYS): vol.All(
+        cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=1, max=31))]
+    ),
     vol.Optional(ATTR_HIDDEN, default=False): cv.boolean,
     vol.Optional(CONF_TAG, default=DEFAULT_TAG): cv.string,
     vol.Optional(CONF_SUMMARY): cv.string,
@@ -88,15 +165,35 @@ SENSOR_CONFIG_SCHEMA = vol.Schema({
     vol.Optional(CONF_INCLUDE_DATES): cv.ensure_list,
     vol.Optional(CONF_VERBOSE_FORMAT, default=DEFAULT_VERBOSE_FORMAT): cv.string,
     vol.Optional(CONF_ENABLED, default=DEFAULT_ENABLED): cv.boolean,
-})
+}), rrule_has_date)
 
 CONFIG_SCHEMA = vol.Schema({
     DOMAIN: {
         vol.Optional(CONF_SENSORS): vol.All(cv.ensure_list, [SENSOR_CONFIG_SCHEMA]),
         vol.Optional(CONF_PREFIX): cv.string,
+        vol.Optional(
+            CONF_EXECUTOR_THRESHOLD, default=DEFAULT_EXECUTOR_THRESHOLD
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_PROCESS_THRESHOLD): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_CACHE_MONTHS, default=DEFAULT_CACHE_MONTHS): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
     }
 }, extra=vol.ALLOW_EXTRA)
 
+GET_STATS_SCHEMA = vol.Schema({
+    vol.Optional(CONF_SLOWEST, default=DEFAULT_SLOWEST): cv.positive_int,
+})
+
+LIST_UPCOMING_SCHEMA = vol.Schema({
+    vol.Optional(CONF_CALENDAR): cv.string,
+    vol.Optional(CONF_START): cv.date,
+    vol.Optional(CONF_LIMIT, default=DEFAULT_LIMIT): vol.All(
+        vol.Coerce(int), vol.Range(min=1)
+    ),
+    vol.Optional(CONF_CURSOR): cv.string,
+})
+
 
 async def async_setup(hass, config):
     """Set up this component using YAML."""
@@ -113,17 +210,89 @@ async def async_setup(hass, config):
     # Platform global configurations
     hass.data[DOMAIN] = {}
     hass.data[DOMAIN][DOMAIN_CONFIG] = config[DOMAIN]
+    hass.data[DOMAIN][DOMAIN_BATCH] = BatchEngine()
+    hass.data[DOMAIN][DOMAIN_SCHEDULER] = ReminderScheduler(
+        hass, partial(async_scheduled_update_reminders, hass)
+    )
+    hass.data[DOMAIN][DOMAIN_TEMPLATES] = SharedTemplates(hass)
+    hass.data[DOMAIN][DOMAIN_STATS] = ReminderStats()
+    hass.data[DOMAIN][DOMAIN_SNAPSHOT] = ReminderSnapshot(hass)
+    await hass.data[DOMAIN][DOMAIN_SNAPSHOT].async_load()
+
+    async def async_get_stats(call):
+        """Fire event with reminders statistics and slowest reminders."""
+        stats = hass.data[DOMAIN][DOMAIN_STATS].as_dict(call.data[CONF_SLOWEST])
+        _LOGGER.info("Reminders statistics: %s", stats)
+        hass.bus.async_fire(EVENT_STATS, stats)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_GET_STATS, async_get_stats, schema=GET_STATS_SCHEMA
+    )
+
+    async def async_list_upcoming(call):
+        """Fire event with the next events of all reminders, or of a calendar."""
+        name = call.data.get(CONF_CALENDAR)
+        start_date = call.data.get(CONF_START, UpdateTick().date)
+        # Reminders without occurrences from the start date are pruned
+        sources = [
+            source
+            for data in hass.data[DOMAIN].get(CALENDAR_PLATFORM, {}).values()
+            if name is None or data.name == name
+            for source in data.event_sources(start_date)
+        ]
+        with hass.data[DOMAIN][DOMAIN_STATS].timer("list_upcoming"):
+            try:
+                events, cursor = list_upcoming(
+                    sources,
+                    start_date,
+                    call.data[CONF_LIMIT],
+                    call.data.get(CONF_CURSOR),
+                )
+            except ValueError:
+                _LOGGER.error("Invalid cursor %s", call.data.get(CONF_CURSOR))
+                return
+        hass.bus.async_fire(EVENT_UPCOMING, {"events": events, CONF_CURSOR: cursor})
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_LIST_UPCOMING, async_list_upcoming, schema=LIST_UPCOMING_SCHEMA
+    )
+
+    async def async_reload(call):
+        """Reload reminders YAML configuration, rebuilding only changed reminders."""
+        try:
+            conf = await conf_util.async_hass_config_yaml(hass)
+        except HomeAssistantError as err:
+            _LOGGER.error(err)
+            return
+        integration = await async_get_integration(hass, DOMAIN)
+        processed = await conf_util.async_process_component_config(hass, conf, integration)
+        if processed is None:
+            # Invalid configuration, already logged
+            return
+        # Without reminder configuration, all reminders are removed
+        domain_config = processed.get(DOMAIN) or {}
+        hass.data[DOMAIN][DOMAIN_CONFIG] = domain_config
+        entries = [entry for entry in domain_config.get(CONF_SENSORS, []) if entry[CONF_ENABLED]]
+        with hass.data[DOMAIN][DOMAIN_STATS].timer("reload"):
+            await async_reload_reminders(hass, entries)
 
-    for entry in platform_config:
-        # _LOGGER.debug(
-        #     "Setting %s from YAML configuration",
-        #     entry[CONF_NAME],
-        # )
-        # If entry is not enabled, skip.
-        if not entry[CONF_ENABLED]:
-            continue
-        hass.async_create_task(
-            discovery.async_load_platform(hass, SENSOR_PLATFORM, DOMAIN, entry, config)
+    hass.services.async_register(DOMAIN, SERVICE_RELOAD, async_reload)
+
+    @callback
+    def async_stop(_):
+        """Cancel all scheduled reminders updates."""
+        hass.data[DOMAIN][DOMAIN_SCHEDULER].async_stop()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop)
+
+    hass.http.register_view(ReminderICalView)
+
+    # Load all enabled entries with a single platform setup
+    entries = [entry for entry in platform_config if entry[CONF_ENABLED]]
+    hass.async_create_task(
+        discovery.async_load_platform(
+            hass, SENSOR_PLATFORM, DOMAIN, {CONF_SENSORS: entries}, config
         )
-    
+    )
+
     return True
@@ -0,0 +1,149 @@
+"""Vectorized next date computation for large reminder populations."""
+
+import logging
+from datetime import date
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from .rule import ReminderRule
+
+_LOGGER = logging.getLogger(__name__)
+
+# Populations smaller than this are faster to compute one by one
+BATCH_MIN_SIZE = 500
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Stand for missing first and last dates
+_NO_FIRST_DATE = -(2 ** 62)
+_NO_DATE = 2 ** 62
+
+
+def is_batch_available(size: int) -> bool:
+    """True if batch engine is worth using for the given population size."""
+    return np is not None and size >= BATCH_MIN_SIZE
+
+
+def _days(d: Optional[date], default):
+    """Returns days since epoch of date, or default if missing."""
+    return default if d is None else d.toordinal() - _EPOCH_ORDINAL
+
+
+def _month_days(months):
+    """Returns epoch days of first day of months (months since epoch)."""
+    return months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+
+def _next_days(frequency: str, anchors, periods, days, query):
+    """Returns epoch days of first occurrence on or after query, for one frequency."""
+    if frequency == "none":
+        return anchors
+    if frequency in ("daily", "weekly"):
+        steps = periods * (7 if frequency == "weekly" else 1)
+        index = np.maximum(-((anchors - query) // steps), 0)
+        return anchors + index * steps
+    steps = periods * (12 if frequency == "yearly" else 1)
+    anchor_months = anchors.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    query_months = query.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    index = np.maximum(-((anchor_months - query_months) // steps), 0)
+    result = None
+    for _ in range(2):
+        months = anchor_months + index * steps
+        first_days = _month_days(months)
+        month_lengths = _month_days(months + 1) - first_days
+        result = first_days + np.minimum(days, month_lengths) - 1
+        # Day may be clamped before query, in query month
+        passed = result < query
+        if not passed.any():
+            break
+        index = index + passed
+    return result
+
+
+def _is_scalar(rule: ReminderRule) -> bool:
+    """True if rule next date is not computed as arrays."""
+    return rule.rrule is not None or bool(rule.days_mask)
+
+
+class BatchEngine:
+    """Next dates of a reminder population, computed as arrays by frequency.
+
+    Population arrays are kept until the population rules change.
+    """
+
+    def __init__(self):
+        """Initialize engine with empty population."""
+        self._rules = ()
+        self._groups = []
+        self._sparse = []
+        self._scalar = []
+
+    def _compile(self, rules: Sequence[ReminderRule]) -> None:
+        """Build population arrays, grouped by frequency."""
+        self._rules = tuple(rules)
+        positions_by_frequency = {}
+        for position, rule in enumerate(rules):
+            # RRULE and several days recurrences are computed one by one
+            if rule.date is not None and not _is_scalar(rule):
+                positions_by_frequency.setdefault(rule.frequency, []).append(position)
+        self._groups = []
+        for frequency, positions in positions_by_frequency.items():
+            group = [rules[position] for position in positions]
+            size = len(group)
+            self._groups.append((
+                frequency,
+                positions,
+                np.fromiter((_days(r.date, 0) for r in group), np.int64, size),
+                np.fromiter((r.period for r in group), np.int64, size),
+                np.fromiter((r.date.day for r in group), np.int64, size),
+                np.fromiter((_days(r.first_date, _NO_FIRST_DATE) for r in group), np.int64, size),
+                np.fromiter((_days(r.last_date, _NO_DATE) for r in group), np.int64, size),
+            ))
+        self._sparse = [
+            position
+            for position, rule in enumerate(rules)
+            if rule.has_date_sets and not _is_scalar(rule)
+        ]
+        self._scalar = [position for position, rule in enumerate(rules) if _is_scalar(rule)]
+
+    def find_next_dates(
+        self, rules: Sequence[ReminderRule], first_date: date
+    ) -> List[Optional[date]]:
+        """Returns next date of all rules, on or after first_date.
+
+        Rules with exclude or include dates are corrected one by one, only if
+        their result is affected. RRULE and several days rules are always computed
+        one by one.
+        """
+        if tuple(rules) != self._rules:
+            self._compile(rules)
+        results = [None] * len(rules)
+        query_days = _days(first_date, None)
+        for frequency, positions, anchors, periods, days, first_days, last_days in self._groups:
+            query = np.maximum(first_days, query_days)
+            next_days = _next_days(frequency, anchors, periods, days, query)
+            found = (next_days >= query) & (next_days <= last_days)
+            for position, next_day, is_found in zip(
+                positions, next_days.tolist(), found.tolist()
+            ):
+                if is_found:
+                    results[position] = date.fromordinal(next_day + _EPOCH_ORDINAL)
+        # Sparse correction of rules affected by exclude and include dates
+        corrected = 0
+        for position in self._sparse:
+            rule = rules[position]
+            next_date = results[position]
+            if (
+                next_date is not None
+                and rule.is_recurring
+                and rule.is_excluded(next_date)
+            ) or next(rule.iter_include_dates(first_date, next_date), None) is not None:
+                results[position] = next(rule.iter_occurrences(first_date), None)
+                corrected += 1
+        for position in self._scalar:
+            results[position] = next(rules[position].iter_occurrences(first_date), None)
+        _LOGGER.debug("Found %d next dates, %d corrected", len(rules), corrected)
+        return results
@@ -0,0 +1,86 @@
+"""Occurrences cache for reminders."""
+
+import logging
+from collections import OrderedDict
+from datetime import date
+
+from .expand import iter_months, month_bounds
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OccurrenceCache:
+    """Bounded LRU cache of reminder occurrences, by month."""
+
+    def __init__(self, max_size: int):
+        """Initialize an empty cache."""
+        self._max_size = max_size
+        self._months = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._months)
+
+    @property
+    def max_size(self) -> int:
+        """Return maximal number of cached months."""
+        return self._max_size
+
+    def resize(self, max_size: int) -> None:
+        """Change maximal number of cached months, dropping the least recently used."""
+        self._max_size = max_size
+        while len(self._months) > self._max_size:
+            self._months.popitem(last=False)
+
+    def _lookup(self, reminder, year: int, month: int):
+        """Returns cached reminder occurrences in given month, None if not cached."""
+        key = (reminder.entity_id, reminder.rule_version, year, month)
+        occurrences = self._months.get(key)
+        if occurrences is not None:
+            self.hits += 1
+            self._months.move_to_end(key)
+        else:
+            self.misses += 1
+        return occurrences
+
+    def set_month(
+        self, entity_id: str, rule_version: int, year: int, month: int, occurrences: tuple
+    ) -> None:
+        """Store occurrences of a reminder rule version in given month."""
+        self._months[(entity_id, rule_version, year, month)] = occurrences
+        if len(self._months) > self._max_size:
+            self._months.popitem(last=False)
+
+    def _get_month(self, reminder, year: int, month: int):
+        """Returns reminder occurrences in given month."""
+        occurrences = self._lookup(reminder, year, month)
+        if occurrences is None:
+            occurrences = tuple(reminder.iter_occurrences(*month_bounds(year, month)))
+            self.set_month(reminder.entity_id, reminder.rule_version, year, month, occurrences)
+        return occurrences
+
+    def get_months(self, reminder, first_date: date, last_date: date) -> dict:
+        """Returns cached reminder occurrences between first_date and last_date, by month."""
+        cached = {}
+        for year, month in iter_months(first_date, last_date):
+            occurrences = self._lookup(reminder, year, month)
+            if occurrences is not None:
+                cached[(year, month)] = occurrences
+        return cached
+
+    def iter_occurrences(self, reminder, first_date: date, last_date: date):
+        """Yield reminder occurrences between first_date and last_date (including both)."""
+        for year, month in iter_months(first_date, last_date):
+            for occurrence in self._get_month(reminder, year, month):
+                if first_date <= occurrence <= last_date:
+                    yield occurrence
+
+    def invalidate(self, entity_id: str) -> None:
+        """Remove all cached occurrences of an entity."""
+        for key in [key for key in self._months if key[0] == entity_id]:
+            del self._months[key]
+
+    def clear(self) -> None:
+        """Remove all cached occurrences."""
+        self._months.clear()
@@ -1,158 +1,332 @@
 """Reminder calendar."""
 
+import asyncio
+import heapq
 import logging
-from datetime import datetime, timedelta
+import os
+from datetime import timedelta
 
 from homeassistant.components.calendar import CalendarEventDevice
-from homeassistant.util import Throttle
+from homeassistant.core import callback
+from homeassistant.helpers.discovery import async_load_platform
 
-from .const import CALENDAR_NAME, CALENDAR_PLATFORM, DOMAIN, SENSOR_PLATFORM
+from .cache import OccurrenceCache
+from .const import (
+    CALENDAR_PLATFORM,
+    CONF_CACHE_MONTHS,
+    CONF_EXECUTOR_THRESHOLD,
+    CONF_PROCESS_THRESHOLD,
+    DEFAULT_CACHE_MONTHS,
+    DEFAULT_EXECUTOR_THRESHOLD,
+    DOMAIN,
+    DOMAIN_CONFIG,
+    DOMAIN_STATS,
+    SENSOR_PLATFORM,
+)
+from .expand import EventSource, expand_cached_events, get_process_pool, source_events
+from .rangeindex import ReminderRangeIndex
 
 _LOGGER = logging.getLogger(__name__)
 
-MIN_TIME_BETWEEN_UPDATES = timedelta(minutes=1)
-
 
 async def async_setup_platform(
     hass, config, async_add_entities, discovery_info=None
 ):  # pylint: disable=unused-argument
-    """Add calendar entities to HA, of there are calendar instances."""
-    # Only single instance allowed
-    if RemindersCalendar.instances == 0:
-        async_add_entities([RemindersCalendar(hass)], True)
+    """Add calendar entity of a reminders calendar partition."""
+    data = hass.data[DOMAIN][CALENDAR_PLATFORM].get(discovery_info["name"])
+    # Partition may be removed before its calendar is set up
+    if data is not None and data.calendar is None:
+        async_add_entities([RemindersCalendar(data)])
 
 
-class RemindersCalendar(CalendarEventDevice):
-    """The reminders calendar class."""
+@callback
+def async_add_to_calendar(hass, reminder) -> None:
+    """Add reminder to its calendar partition, creating the partition if needed."""
+    calendars = hass.data[DOMAIN].setdefault(CALENDAR_PLATFORM, {})
+    data = calendars.get(reminder.calendar)
+    if data is None:
+        _LOGGER.debug("Creating %s calendar", reminder.calendar)
+        data = calendars[reminder.calendar] = EntitiesCalendarData(hass, reminder.calendar)
+        hass.async_create_task(
+            async_load_platform(
+                hass,
+                CALENDAR_PLATFORM,
+                DOMAIN,
+                {"name": reminder.calendar},
+                {"name": reminder.calendar},
+            )
+        )
+    data.add_entity(reminder.entity_id)
+    data.set_rule(reminder.entity_id, reminder.rule)
+
+
+@callback
+def async_remove_from_calendar(hass, reminder) -> None:
+    """Remove reminder from its calendar partition, removing the partition if empty."""
+    calendars = hass.data[DOMAIN].get(CALENDAR_PLATFORM, {})
+    data = calendars.get(reminder.calendar)
+    if data is None:
+        return
+    data.remove_entity(reminder.entity_id)
+    if not data.entities:
+        _LOGGER.debug("Removing %s calendar", reminder.calendar)
+        del calendars[reminder.calendar]
+        if data.calendar is not None:
+            hass.async_create_task(data.calendar.async_remove())
 
-    instances = 0
 
-    def __init__(self, hass):
-        """Create empry calendar."""
-        self._cal_data = {}
-        self._name = CALENDAR_NAME
-        RemindersCalendar.instances += 1
+@callback
+def async_write_calendars_state(hass, names) -> None:
+    """Write state of the calendars of given partitions, if it changed."""
+    calendars = hass.data[DOMAIN].get(CALENDAR_PLATFORM, {})
+    for name in names:
+        data = calendars.get(name)
+        if data is not None and data.calendar is not None:
+            data.calendar.async_write_ha_state_if_changed()
+
+
+class RemindersCalendar(CalendarEventDevice):
+    """The reminders calendar class, one per calendar partition."""
+
+    def __init__(self, data):
+        """Create calendar of a reminders partition."""
+        self._data = data
+        self._name = data.name
+        self._written_state = None
+        data.calendar = self
 
     @property
     def event(self):
         """Return the next upcoming event."""
-        return self.hass.data[DOMAIN][CALENDAR_PLATFORM].event
+        return self._data.event
 
     @property
     def name(self):
         """Return the name of the entity."""
         return self._name
 
-    async def async_update(self):
-        """Update all calendars."""
-        await self.hass.data[DOMAIN][CALENDAR_PLATFORM].async_update()
+    @property
+    def should_poll(self):
+        """Calendar is updated by its reminders."""
+        return False
 
     async def async_get_events(self, hass, start_date, end_date):
         """Get all events in a specific time frame."""
-        return await self.hass.data[DOMAIN][CALENDAR_PLATFORM].async_get_events(
-            hass, start_date, end_date
-        )
+        return await self._data.async_get_events(hass, start_date, end_date)
+
+    @callback
+    def async_write_ha_state_if_changed(self) -> None:
+        """Write the state only if state or event changed since last write.
+
+        State is on during the next event, so it changes with time even if the
+        event does not.
+        """
+        if self.hass is None:
+            return
+        written_state = (self.state, self._data.event)
+        if written_state == self._written_state:
+            return
+        self._written_state = written_state
+        self.async_write_ha_state()
 
     @property
     def device_state_attributes(self):
         """Return the device state attributes."""
-        if self.hass.data[DOMAIN][CALENDAR_PLATFORM].event is None:
+        if self._data.event is None:
             # No tasks, we don't need to show anything.
             return None
-        return {}
+        cache = self._data.cache
+        return {"cache_hits": cache.hits, "cache_misses": cache.misses}
 
 
 class EntitiesCalendarData:
-    """Class used by the Entities Calendar class to hold all entity events."""
+    """Class used by the Entities Calendar class to hold its partition entity events."""
 
-    def __init__(self, hass):
+    def __init__(self, hass, name):
         """Initialize an Entities Calendar Data."""
-        self.event = None
+        self.calendar = None
+        self.name = name
         self._hass = hass
-        self.entities = []
+        self.entities = {}
+        self._next_dates = {}
+        self._next_dates_heap = []
+        self._event = None
+        self._rules = {}
+        self.index = ReminderRangeIndex()
+        self.cache = OccurrenceCache(DEFAULT_CACHE_MONTHS)
 
     def add_entity(self, entity_id):
         """Append entity ID to the calendar."""
-        if entity_id not in self.entities:
-            self.entities.append(entity_id)
+        self.entities[entity_id] = None
 
     def remove_entity(self, entity_id):
         """Remove entity ID from the calendar."""
         if entity_id in self.entities:
-            self.entities.remove(entity_id)
+            del self.entities[entity_id]
+            self._rules.pop(entity_id, None)
+            self.index.remove(entity_id)
+            self.cache.invalidate(entity_id)
+            self.set_next_date(entity_id, None)
 
-    async def async_get_events(self, hass, start_datetime, end_datetime):
-        """Get all tasks in a specific time frame."""
-        events = []
-        if SENSOR_PLATFORM not in hass.data[DOMAIN]:
-            return events
-        start_date = start_datetime.date()
-        end_date = end_datetime.date()
-        for entity in self.entities:
-            if (
-                entity not in hass.data[DOMAIN][SENSOR_PLATFORM]
-                or hass.data[DOMAIN][SENSOR_PLATFORM][entity].hidden
-            ):
-                _LOGGER.debug(entity)
-                continue
-            reminder = hass.data[DOMAIN][SENSOR_PLATFORM][entity]
-            start = await reminder.async_find_next_date(start_date, True)
-            while start is not None and start >= start_date and start <= end_date:
-                try:
-                    end = start + timedelta(days=1)
-                except TypeError:
-                    end = start
-                if reminder.all_day:
-                    event = {
-                        "uid": entity,
-                        "summary": reminder.summary,
-                        "description": reminder.description,
-                        "start": {"date": start.strftime("%Y-%m-%d")},
-                        "end": {"date": end.strftime("%Y-%m-%d")},
-                        "allDay": True,
-                    }
-                else:
-                    event = {
-                        "uid": entity,
-                        "summary": reminder.summary,
-                        "start": {
-                            "date": datetime.combine(
-                                start, reminder.start_time
-                            ).strftime("%Y-%m-%d %H:%M")
-                        },
-                        "end": {
-                            "date": datetime.combine(
-                                start, reminder.end_time if reminder.end_time else reminder.start_time
-                            ).strftime("%Y-%m-%d %H:%M")
-                        },
-                        "allDay": False,
-                    }                 
-                events.append(event)
-                start = await reminder.async_find_next_date(
-                    start + timedelta(days=1), True
-                )
-        return events   
-
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    async def async_update(self):
-        """Get the latest data."""
-        next_dates = {}
-        for entity in self.entities:
-            if self._hass.data[DOMAIN][SENSOR_PLATFORM][entity]._next_date is not None:
-                next_dates[entity] = self._hass.data[DOMAIN][SENSOR_PLATFORM][
-                    entity
-                ]._next_date
-        if len(next_dates) > 0:
-            entity_id = min(next_dates.keys(), key=(lambda k: next_dates[k]))
-            start = next_dates[entity_id]
+    @callback
+    def set_rule(self, entity_id, rule):
+        """Update the active ranges index with entity rule."""
+        if entity_id not in self.entities or self._rules.get(entity_id) is rule:
+            return
+        self._rules[entity_id] = rule
+        self.index.set_range(entity_id, rule.active_range)
+
+    @callback
+    def set_next_date(self, entity_id, next_date):
+        """Update the next events index with entity next date."""
+        if entity_id not in self.entities and next_date is not None:
+            return
+        if self._next_dates.get(entity_id) == next_date:
+            return
+        self._hass.data[DOMAIN][DOMAIN_STATS].increment("calendar_index_updates")
+        current = self._next_event()
+        if next_date is None:
+            self._next_dates.pop(entity_id, None)
+        else:
+            self._next_dates[entity_id] = next_date
+            heapq.heappush(self._next_dates_heap, (next_date, entity_id))
+        if self._next_event() != current:
+            self._event = None
+            if self.calendar is not None:
+                self.calendar.async_write_ha_state_if_changed()
+
+    def _next_event(self):
+        """Returns (date, entity ID) of the next event."""
+        heap = self._next_dates_heap
+        # Drop entries replaced by a later update
+        while heap and self._next_dates.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    @property
+    def event(self):
+        """Return the next upcoming event."""
+        next_event = self._next_event()
+        if next_event is None:
+            return None
+        if self._event is None:
+            start, entity_id = next_event
             end = start + timedelta(days=1)
-            summary = self._hass.data[DOMAIN][SENSOR_PLATFORM][entity_id].summary
-            description = self._hass.data[DOMAIN][SENSOR_PLATFORM][entity_id].description
-            self.event = {
+            reminder = self._hass.data[DOMAIN][SENSOR_PLATFORM][entity_id]
+            self._event = {
                 "uid": entity_id,
-                "summary": summary,
-                "description": description,
+                "summary": reminder.summary,
+                "description": reminder.description,
                 "start": {"date": start.strftime("%Y-%m-%d")},
                 "end": {"date": end.strftime("%Y-%m-%d")},
                 "allDay": True,
-            }
\ No newline at end of file
+            }
+        return self._event
+
+    def entities_between(self, start_date, end_date=None) -> list:
+        """Returns entities which may have events between start_date and end_date."""
+        entity_ids = self.index.query(start_date, end_date)
+        self._hass.data[DOMAIN][DOMAIN_STATS].increment(
+            "calendar_pruned", count=len(self.entities) - len(entity_ids)
+        )
+        return entity_ids
+
+    def _reminders(self, start_date=None, end_date=None) -> list:
+        """Returns calendar visible reminders, only those with events in the window if given."""
+        sensors = self._hass.data[DOMAIN].get(SENSOR_PLATFORM, {})
+        entity_ids = self.entities
+        if start_date is not None:
+            entity_ids = self.entities_between(start_date, end_date)
+        return [
+            sensors[entity]
+            for entity in entity_ids
+            if entity in sensors and not sensors[entity].hidden
+        ]
+
+    def event_sources(self, start_date=None) -> list:
+        """Returns events sources of calendar visible reminders, from start_date if given."""
+        return [
+            EventSource.from_reminder(reminder) for reminder in self._reminders(start_date)
+        ]
+
+    def _resize_cache(self) -> None:
+        """Size the occurrences cache to the configured months of each reminder."""
+        config = self._hass.data[DOMAIN][DOMAIN_CONFIG]
+        months = config.get(CONF_CACHE_MONTHS, DEFAULT_CACHE_MONTHS)
+        self.cache.resize(max(months * len(self.entities), 1))
+
+    def _cached_sources(self, reminders, start_date, end_date):
+        """Returns events sources, their cached months and rule versions, read on the loop."""
+        self._resize_cache()
+        sources = [EventSource.from_reminder(reminder) for reminder in reminders]
+        cached = [self.cache.get_months(reminder, start_date, end_date) for reminder in reminders]
+        versions = [reminder.rule_version for reminder in reminders]
+        return sources, cached, versions
+
+    def _cache_months(self, sources, versions, expanded) -> None:
+        """Store months expanded outside the loop, by the rule version they were expanded for."""
+        for source, version, months in zip(sources, versions, expanded):
+            for (year, month), occurrences in months.items():
+                self.cache.set_month(source.entity_id, version, year, month, occurrences)
+
+    async def async_get_events(self, hass, start_datetime, end_datetime):
+        """Get all tasks in a specific time frame.
+
+        Only reminders whose active range overlaps the time frame are expanded.
+        Expansions larger than the configured thresholds (in reminder days) run
+        in a thread, or split across a process pool. All paths use the
+        occurrences cache, sized to cache_months months of each reminder.
+        """
+        config = hass.data[DOMAIN][DOMAIN_CONFIG]
+        stats = hass.data[DOMAIN][DOMAIN_STATS]
+        start_date = start_datetime.date()
+        end_date = end_datetime.date()
+        reminders = self._reminders(start_date, end_date)
+        if not reminders:
+            return []
+        size = len(reminders) * ((end_date - start_date).days + 1)
+        process_threshold = config.get(CONF_PROCESS_THRESHOLD)
+        with stats.timer("get_events"):
+            if process_threshold is not None and size >= process_threshold:
+                stats.increment("process_expansions")
+                sources, cached, versions = self._cached_sources(reminders, start_date, end_date)
+                chunk_size = -(-len(sources) // (os.cpu_count() or 1))
+                results = await asyncio.gather(
+                    *(
+                        hass.loop.run_in_executor(
+                            get_process_pool(hass),
+                            expand_cached_events,
+                            sources[index:index + chunk_size],
+                            cached[index:index + chunk_size],
+                            start_date,
+                            end_date,
+                        )
+                        for index in range(0, len(sources), chunk_size)
+                    )
+                )
+                events = [event for result, _ in results for event in result]
+                self._cache_months(
+                    sources, versions, [months for _, result in results for months in result]
+                )
+            elif size >= config.get(CONF_EXECUTOR_THRESHOLD, DEFAULT_EXECUTOR_THRESHOLD):
+                stats.increment("executor_expansions")
+                sources, cached, versions = self._cached_sources(reminders, start_date, end_date)
+                events, expanded = await hass.async_add_executor_job(
+                    expand_cached_events, sources, cached, start_date, end_date
+                )
+                self._cache_months(sources, versions, expanded)
+            else:
+                self._resize_cache()
+                events = []
+                for reminder in reminders:
+                    with stats.timer("calendar_expand", reminder.entity_id):
+                        events.extend(
+                            source_events(
+                                EventSource.from_reminder(reminder),
+                                self.cache.iter_occurrences(reminder, start_date, end_date),
+                            )
+                        )
+        _LOGGER.debug(
+            "Occurrences cache: %d hits, %d misses", self.cache.hits, self.cache.misses
+        )
+        return events
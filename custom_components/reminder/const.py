@@ -2,11 +2,21 @@
 
 # Base component constants
 DOMAIN = "reminder"
+DOMAIN_ADD_ENTITIES = "add_entities"
+DOMAIN_BATCH = "batch"
 DOMAIN_CONFIG = "config"
-CALENDAR_NAME = "Reminders"
+DOMAIN_PROCESS_POOL = "process_pool"
+DOMAIN_SCHEDULER = "scheduler"
+DOMAIN_SNAPSHOT = "snapshot"
+DOMAIN_STATS = "stats"
+DOMAIN_TEMPLATES = "templates"
 SENSOR_PLATFORM = "sensor"
 CALENDAR_PLATFORM = "calendar"
 ATTRIBUTION = "Data from this is provided by reminder."
+EVENT_STATS = "reminder_stats"
+EVENT_UPCOMING = "reminder_upcoming"
+SERVICE_GET_STATS = "get_stats"
+SERVICE_LIST_UPCOMING = "list_upcoming"
 ENTITY_ID_FORMAT = 'sensor' + '.{}'
 ENTITY_ID_PREFIX_FORMAT = 'sensor' + '.{}_{}'
 
@@ -23,6 +33,7 @@ DEVICE_CLASS = "reminder__schedule"
 
 # Configuration
 CONF_CALENDAR = "calendar"
+CONF_CURSOR = "cursor"
 CONF_DATE = "date"
 CONF_DATE_TEMPLATE = "date_template"
 CONF_DATE_FORMAT = "date_format"
@@ -31,6 +42,7 @@ CONF_ENABLED = "enabled"
 CONF_PERIOD = "period"
 CONF_PERIOD_TEMPLATE = "period_template"
 CONF_EXCLUDE_DATES = "exclude_dates"
+CONF_EXECUTOR_THRESHOLD = "executor_threshold"
 CONF_ICON_ON = "icon_on"
 CONF_ICON_OFF = "icon_off"
 CONF_INCLUDE_DATES = "include_dates"
@@ -38,27 +50,41 @@ CONF_FIRST_DATE = "first_date"
 CONF_FREQUENCY = "frequency"
 CONF_FREQUENCY_TEMPLATE = "frequency_template"
 CONF_LAST_DATE = "last_date"
+CONF_LIMIT = "limit"
 CONF_SENSORS = "sensors"
+CONF_SLOWEST = "slowest"
 CONF_SUMMARY = "summary"
 CONF_TAG = "tag"
 CONF_TIME = "time"
+CONF_START = "start"
 CONF_START_TIME = "start_time"
 CONF_END_TIME = "end_time"
 CONF_TIME_FORMAT = "time_format"
 CONF_VERBOSE_FORMAT = "verbose_format"
 CONF_PREFIX = "prefix"
+CONF_PROCESS_THRESHOLD = "process_threshold"
+CONF_RRULE = "rrule"
+CONF_CACHE_MONTHS = "cache_months"
+CONF_WEEKDAYS = "weekdays"
+CONF_MONTHDAYS = "monthdays"
 
 # Defaults
+DEFAULT_CACHE_MONTHS = 24
 DEFAULT_CALENDAR = "Reminders"
 DEFAULT_DATE_FORMAT = "%Y-%m-%d"
 DEFAULT_ENABLED = True
+DEFAULT_EXECUTOR_THRESHOLD = 20000
 DEFAULT_FREQUENCY = "none"
+DEFAULT_ICAL_FUTURE_DAYS = 365
+DEFAULT_ICAL_PAST_DAYS = 31
 DEFAULT_ICON = 'mdi:calendar-blank'
+DEFAULT_LIMIT = 5
 DEFAULT_ICON_ON = 'mdi:calendar-star'
 DEFAULT_ICON_OFF = 'mdi:calendar-blank'
 DEFAULT_START_TIME = "00:00"
 DEFAULT_TIME_FORMAT = "%H:%M"
 DEFAULT_PERIOD = 1
+DEFAULT_SLOWEST = 10
 DEFAULT_TAG = "reminder"
 DEFAULT_VERBOSE_FORMAT = "Next on {date}"
 
@@ -71,6 +97,17 @@ FREQUENCY_OPTIONS = [
     "none",
 ]
 
+# Weekly reminders days, bit index in the rule weekdays mask
+WEEKDAY_OPTIONS = [
+    "mon",
+    "tue",
+    "wed",
+    "thu",
+    "fri",
+    "sat",
+    "sun",
+]
+
 #
 STATE_TYPE_OPTIONS = [
     "switch",
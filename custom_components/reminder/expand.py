@@ -0,0 +1,167 @@
+"""Calendar events expansion, safe to run outside the event loop."""
+
+import heapq
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+from .const import DOMAIN, DOMAIN_PROCESS_POOL
+from .rule import ReminderRule
+
+
+class EventSource(NamedTuple):
+    """Immutable snapshot of a reminder, all needed to expand its events."""
+
+    entity_id: str
+    summary: str
+    description: Optional[str]
+    rule: ReminderRule
+    start_time: time
+    end_time: Optional[time]
+
+    @classmethod
+    def from_reminder(cls, reminder) -> "EventSource":
+        """Returns snapshot of reminder current rule."""
+        return cls(
+            reminder.entity_id,
+            reminder.summary,
+            reminder.description,
+            reminder.rule,
+            reminder.start_time,
+            reminder.end_time,
+        )
+
+
+# Separates cursor start time (ISO format) and entity ID
+_CURSOR_SEPARATOR = "|"
+
+
+def source_event(source: EventSource, start: date) -> dict:
+    """Returns event of a reminder occurrence."""
+    if source.rule.all_day:
+        return {
+            "uid": source.entity_id,
+            "summary": source.summary,
+            "description": source.description,
+            "start": {"date": start.strftime("%Y-%m-%d")},
+            "end": {"date": (start + timedelta(days=1)).strftime("%Y-%m-%d")},
+            "allDay": True,
+        }
+    return {
+        "uid": source.entity_id,
+        "summary": source.summary,
+        "start": {
+            "date": datetime.combine(start, source.start_time).strftime("%Y-%m-%d %H:%M")
+        },
+        "end": {
+            "date": datetime.combine(
+                start, source.end_time if source.end_time else source.start_time
+            ).strftime("%Y-%m-%d %H:%M")
+        },
+        "allDay": False,
+    }
+
+
+def source_events(source: EventSource, occurrences: Iterable[date]):
+    """Yield event of each reminder occurrence."""
+    for start in occurrences:
+        yield source_event(source, start)
+
+
+def _source_starts(index: int, source: EventSource, first_date: date):
+    """Yield (start time, entity ID, source index, date) of reminder occurrences."""
+    for start in source.rule.iter_occurrences(first_date):
+        yield datetime.combine(start, source.start_time), source.entity_id, index, start
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """Returns first and last dates of a month."""
+    return (
+        date(year, month, 1),
+        date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1),
+    )
+
+
+def iter_months(first_date: date, last_date: date):
+    """Yield (year, month) of all months between first_date and last_date."""
+    year, month = first_date.year, first_date.month
+    while (year, month) <= (last_date.year, last_date.month):
+        yield year, month
+        year, month = year + month // 12, month % 12 + 1
+
+
+def list_upcoming(
+    sources: List[EventSource],
+    first_date: date,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """Returns up to limit events on or after first_date, ordered by start time.
+
+    Occurrences of all sources are merged lazily, only the returned events are
+    built. Returned cursor continues after the last event, it is None if there
+    are no more events.
+    """
+    after = None
+    if cursor:
+        start, _, entity_id = cursor.partition(_CURSOR_SEPARATOR)
+        after = (datetime.fromisoformat(start), entity_id)
+        first_date = max(first_date, after[0].date())
+    starts = heapq.merge(
+        *(_source_starts(index, source, first_date) for index, source in enumerate(sources))
+    )
+    if after is not None:
+        starts = (item for item in starts if item[:2] > after)
+    # One more event tells whether there is a next page
+    page = list(islice(starts, limit + 1))
+    events = [source_event(sources[index], start) for _, _, index, start in page[:limit]]
+    next_cursor = None
+    if len(page) > limit:
+        start_time, entity_id = page[limit - 1][:2]
+        next_cursor = f"{start_time.isoformat()}{_CURSOR_SEPARATOR}{entity_id}"
+    return events, next_cursor
+
+
+def expand_cached_events(
+    sources: List[EventSource], cached: List[dict], start_date: date, end_date: date
+) -> Tuple[list, List[dict]]:
+    """Returns events of all sources in a specific time frame, and the months expanded.
+
+    Each source cached months occurrences (by (year, month)) are used as is,
+    only other months are expanded and returned, to be cached.
+    """
+    events = []
+    expanded = []
+    for source, months in zip(sources, cached):
+        new_months = {}
+        occurrences = []
+        for year, month in iter_months(start_date, end_date):
+            found = months.get((year, month))
+            if found is None:
+                found = new_months[(year, month)] = tuple(
+                    source.rule.iter_occurrences(*month_bounds(year, month))
+                )
+            occurrences.extend(day for day in found if start_date <= day <= end_date)
+        events.extend(source_events(source, occurrences))
+        expanded.append(new_months)
+    return events, expanded
+
+
+def get_process_pool(hass) -> ProcessPoolExecutor:
+    """Returns the process pool shared by all calendars, created on first use."""
+    pool = hass.data[DOMAIN].get(DOMAIN_PROCESS_POOL)
+    if pool is None:
+        # Spawned workers do not inherit the event loop threads
+        pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+        )
+        hass.data[DOMAIN][DOMAIN_PROCESS_POOL] = pool
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, lambda _: pool.shutdown(wait=False)
+        )
+    return pool
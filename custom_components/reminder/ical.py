@@ -0,0 +1,175 @@
+"""Reminders iCalendar feed."""
+
+import hashlib
+import logging
+from datetime import date, datetime, timedelta
+
+from aiohttp import hdrs, web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.util import slugify
+import homeassistant.util.dt as dt_util
+
+from .const import (
+    CALENDAR_PLATFORM,
+    DEFAULT_ICAL_FUTURE_DAYS,
+    DEFAULT_ICAL_PAST_DAYS,
+    DOMAIN,
+    DOMAIN_STATS,
+    SENSOR_PLATFORM,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Feed is written to the client in chunks of this size
+CHUNK_SIZE = 64 * 1024
+
+
+def _escape(text) -> str:
+    """Escape iCalendar text value."""
+    return (
+        str(text)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Returns content line folded to 75 octets lines."""
+    encoded = line.encode()
+    lines = []
+    # Continuation lines start with a space
+    size = 75
+    while len(encoded) > size:
+        # Never split a multi-byte character
+        while encoded[size] & 0xC0 == 0x80:
+            size -= 1
+        lines.append(encoded[:size].decode())
+        encoded = encoded[size:]
+        size = 74
+    lines.append(encoded.decode())
+    return "\r\n ".join(lines) + "\r\n"
+
+
+def _reminder_events(reminder, start_date, end_date, stamp):
+    """Yield reminder VEVENT lines in a specific time frame."""
+    rule = reminder.rule
+    summary = _fold(f"SUMMARY:{_escape(reminder.summary)}")
+    description = ""
+    if reminder.description:
+        description = _fold(f"DESCRIPTION:{_escape(reminder.description)}")
+    for start in reminder.iter_occurrences(start_date, end_date):
+        yield "BEGIN:VEVENT\r\n"
+        yield f"UID:{reminder.entity_id}-{start:%Y%m%d}@{DOMAIN}\r\n"
+        yield stamp
+        if rule.all_day:
+            yield f"DTSTART;VALUE=DATE:{start:%Y%m%d}\r\n"
+            yield f"DTEND;VALUE=DATE:{start + timedelta(days=1):%Y%m%d}\r\n"
+        else:
+            start_time = datetime.combine(start, reminder.start_time)
+            end_time = datetime.combine(start, reminder.end_time or reminder.start_time)
+            yield f"DTSTART:{start_time:%Y%m%dT%H%M%S}\r\n"
+            yield f"DTEND:{end_time:%Y%m%dT%H%M%S}\r\n"
+        yield summary
+        yield description
+        yield "END:VEVENT\r\n"
+
+
+class ReminderICalView(HomeAssistantView):
+    """View serving reminders as an iCalendar feed.
+
+    The whole feed, or a single calendar group, is streamed as it is expanded.
+    A feed whose reminders did not change is answered with 304, without any
+    expansion.
+    """
+
+    url = "/api/reminder/ical"
+    extra_urls = ["/api/reminder/ical/{calendar}"]
+    name = "api:reminder:ical"
+
+    def _reminders(self, hass, calendar, start_date, end_date):
+        """Returns feed reminders with events in the window, sorted by entity ID."""
+        sensors = hass.data[DOMAIN].get(SENSOR_PLATFORM, {})
+        partitions = hass.data[DOMAIN].get(CALENDAR_PLATFORM, {}).values()
+        if calendar is not None:
+            # Only the calendar group partition is scanned
+            partitions = [data for data in partitions if slugify(data.name) == slugify(calendar)]
+        return sorted(
+            (
+                sensors[entity_id]
+                for data in partitions
+                for entity_id in data.entities_between(start_date, end_date)
+                if entity_id in sensors
+            ),
+            key=lambda reminder: reminder.entity_id,
+        )
+
+    @staticmethod
+    def _etag(reminders, start_date, end_date) -> str:
+        """Returns feed entity tag, a hash of its reminders rules and window."""
+        digest = hashlib.sha1(f"{start_date}:{end_date}".encode())
+        for reminder in reminders:
+            digest.update(
+                repr(
+                    (
+                        reminder.entity_id,
+                        reminder.rule.fingerprint,
+                        reminder.summary,
+                        reminder.description,
+                    )
+                ).encode()
+            )
+        return f'W/"{digest.hexdigest()}"'
+
+    async def get(self, request, calendar=None):
+        """Stream reminders feed."""
+        hass = request.app["hass"]
+        today = date.today()
+        try:
+            start_date = date.fromisoformat(
+                request.query.get("start", str(today - timedelta(days=DEFAULT_ICAL_PAST_DAYS)))
+            )
+            end_date = date.fromisoformat(
+                request.query.get("end", str(today + timedelta(days=DEFAULT_ICAL_FUTURE_DAYS)))
+            )
+        except ValueError:
+            return self.json_message("Invalid start or end date", 400)
+
+        reminders = self._reminders(hass, calendar, start_date, end_date)
+        etag = self._etag(reminders, start_date, end_date)
+        if etag in request.headers.get(hdrs.IF_NONE_MATCH, ""):
+            return web.Response(status=304, headers={hdrs.ETAG: etag})
+
+        response = web.StreamResponse(
+            headers={
+                hdrs.CONTENT_TYPE: "text/calendar; charset=utf-8",
+                hdrs.ETAG: etag,
+            }
+        )
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        stats = hass.data[DOMAIN][DOMAIN_STATS]
+        stamp = f"DTSTAMP:{dt_util.utcnow():%Y%m%dT%H%M%SZ}\r\n"
+        chunk = [
+            "BEGIN:VCALENDAR\r\n",
+            "VERSION:2.0\r\n",
+            f"PRODID:-//{DOMAIN}//{DOMAIN}//EN\r\n",
+            _fold(f"X-WR-CALNAME:{_escape(calendar or DOMAIN)}"),
+        ]
+        size = 0
+        with stats.timer("ical_feed"):
+            for reminder in reminders:
+                for line in _reminder_events(reminder, start_date, end_date, stamp):
+                    chunk.append(line)
+                    size += len(line)
+                    if size >= CHUNK_SIZE:
+                        await response.write("".join(chunk).encode())
+                        chunk = []
+                        size = 0
+        chunk.append("END:VCALENDAR\r\n")
+        await response.write("".join(chunk).encode())
+        await response.write_eof()
+        return response
@@ -0,0 +1,98 @@
+"""Index of reminders active date ranges, to prune calendar windows."""
+
+import bisect
+from datetime import date
+from typing import List, Optional, Tuple
+
+
+class ReminderRangeIndex:
+    """Reminders active date ranges, queried by date window.
+
+    One time reminders are kept in a sorted array of dates. Other ranges are
+    kept in an interval tree (ranges sorted by first date, with a segment tree
+    of their maximal last date), rebuilt on the first query after a change.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._ranges = {}
+        self._one_shots = []
+        self._firsts = []
+        self._entity_ids = []
+        self._max_lasts = [-1, -1]
+        self._size = 1
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._ranges)
+
+    def set_range(self, entity_id: str, active_range: Optional[Tuple[date, date]]) -> None:
+        """Set entity active (first, last) dates, None if it has no occurrences."""
+        self.remove(entity_id)
+        if active_range is None:
+            return
+        first, last = (value.toordinal() for value in active_range)
+        self._ranges[entity_id] = (first, last)
+        if first == last:
+            bisect.insort(self._one_shots, (first, entity_id))
+        else:
+            self._dirty = True
+
+    def remove(self, entity_id: str) -> None:
+        """Remove entity from the index."""
+        active_range = self._ranges.pop(entity_id, None)
+        if active_range is None:
+            return
+        first, last = active_range
+        if first == last:
+            index = bisect.bisect_left(self._one_shots, (first, entity_id))
+            del self._one_shots[index]
+        else:
+            self._dirty = True
+
+    def _build(self) -> None:
+        """Build the interval tree of the ranges which are not one time."""
+        intervals = sorted(
+            (first, last, entity_id)
+            for entity_id, (first, last) in self._ranges.items()
+            if first != last
+        )
+        self._firsts = [first for first, _, _ in intervals]
+        self._entity_ids = [entity_id for _, _, entity_id in intervals]
+        size = 1
+        while size < len(intervals):
+            size *= 2
+        # Leaves hold the last dates, each node the maximum of its children
+        tree = [-1] * (2 * size)
+        for index, (_, last, _) in enumerate(intervals):
+            tree[size + index] = last
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._max_lasts = tree
+        self._size = size
+        self._dirty = False
+
+    def query(self, first_date: date, last_date: Optional[date] = None) -> List[str]:
+        """Returns entities whose range overlaps first_date to last_date (including both)."""
+        if self._dirty:
+            self._build()
+        first = first_date.toordinal()
+        last = (last_date or date.max).toordinal()
+        start = bisect.bisect_left(self._one_shots, (first,))
+        end = bisect.bisect_left(self._one_shots, (last + 1,), start)
+        entity_ids = [entity_id for _, entity_id in self._one_shots[start:end]]
+        # Only ranges starting before the window end, then ending after its start
+        count = bisect.bisect_right(self._firsts, last)
+        tree = self._max_lasts
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= count or tree[node] < first:
+                continue
+            if high - low == 1:
+                entity_ids.append(self._entity_ids[low])
+                continue
+            middle = (low + high) // 2
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+        return entity_ids
@@ -0,0 +1,144 @@
+"""RFC 5545 recurrence (RRULE) for reminders."""
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from dateutil.rrule import DAILY, MONTHLY, WEEKLY, YEARLY, rrulestr
+
+# Number of re-anchored rules kept by each recurrence
+ANCHORED_CACHE_SIZE = 8
+
+_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Parts defining the recurrence days, if none is set days are taken from DTSTART
+_DAY_PARTS = ("BYWEEKNO", "BYYEARDAY", "BYMONTHDAY", "BYDAY", "BYEASTER")
+
+# Gregorian calendar (and weekdays) repeat every 400 years
+_CYCLE_YEARS = 400
+
+
+def _parse_parts(rule: str) -> Dict[str, str]:
+    """Returns RRULE parts by name."""
+    rule = rule.strip()
+    if rule.upper().startswith("RRULE:"):
+        rule = rule[6:]
+    parts = {}
+    for part in rule.split(";"):
+        if part:
+            name, _, value = part.partition("=")
+            parts[name.strip().upper()] = value.strip()
+    return parts
+
+
+class RRuleRecurrence:
+    """RRULE compiled once, able to seek to any date.
+
+    Rules without COUNT can be re-anchored to the start of the period
+    (year, month, week or day) of any date, keeping the INTERVAL phase. Finding
+    an occurrence then never walks the occurrences before that period.
+    """
+
+    def __init__(self, rule: str, start: date):
+        """Compile RRULE starting on given date."""
+        self._start = datetime(start.year, start.month, start.day)
+        parts = _parse_parts(rule)
+        # Make DTSTART based defaults explicit, re-anchoring must not change them
+        if not any(part in parts for part in _DAY_PARTS):
+            if parts.get("FREQ") == "YEARLY":
+                parts.setdefault("BYMONTH", str(start.month))
+                parts["BYMONTHDAY"] = str(start.day)
+            elif parts.get("FREQ") == "MONTHLY":
+                parts["BYMONTHDAY"] = str(start.day)
+            elif parts.get("FREQ") == "WEEKLY":
+                parts["BYDAY"] = _WEEKDAYS[start.weekday()]
+        self._rule_string = ";".join(f"{name}={value}" for name, value in parts.items())
+        self._rule = rrulestr(self._rule_string, dtstart=self._start, cache=True)
+        self._freq = self._rule._freq
+        self._interval = self._rule._interval
+        if self._interval < 1:
+            raise ValueError(f"INTERVAL {self._interval} is not positive")
+        self._week_start = self._rule._wkst
+        self._seekable = "COUNT" not in parts and self._freq in (
+            YEARLY,
+            MONTHLY,
+            WEEKLY,
+            DAILY,
+        )
+        self._anchored = OrderedDict()
+        self._lock = threading.Lock()
+        # Lookups of a rule without occurrences would walk up to year 9999
+        self.never_occurs = self._pattern_is_empty(parts)
+
+    def _pattern_is_empty(self, parts: Dict[str, str]) -> bool:
+        """True if rule days never match, whatever its COUNT and UNTIL.
+
+        Days are searched from the last whole calendar cycles before year
+        9999, rules repeat with the same phase there.
+        """
+        pattern = ";".join(
+            f"{name}={value}" for name, value in parts.items() if name not in ("COUNT", "UNTIL")
+        )
+        cycle = _CYCLE_YEARS * self._interval
+        start = self._start
+        if 9999 - start.year > 2 * cycle:
+            start = start.replace(
+                year=start.year + (9999 - start.year - 2 * cycle) // cycle * cycle
+            )
+        return rrulestr(pattern, dtstart=start).after(start, inc=True) is None
+
+    def _anchor(self, first: datetime) -> datetime:
+        """Returns start of the latest period, in INTERVAL phase, not after first."""
+        start = self._start
+        if self._freq == YEARLY:
+            years = (first.year - start.year) // self._interval * self._interval
+            return datetime(start.year + years, 1, 1)
+        if self._freq == MONTHLY:
+            months = (
+                (first.year - start.year) * 12 + first.month - start.month
+            ) // self._interval * self._interval
+            year, month = divmod(start.year * 12 + start.month - 1 + months, 12)
+            return datetime(year, month + 1, 1)
+        if self._freq == WEEKLY:
+            week = start - timedelta(days=(start.weekday() - self._week_start) % 7)
+            weeks = (first - week).days // 7 // self._interval * self._interval
+            return week + timedelta(weeks=weeks)
+        days = (first - start).days // self._interval * self._interval
+        return start + timedelta(days=days)
+
+    def _rule_from(self, first: datetime):
+        """Returns rule producing all occurrences on or after first."""
+        if not self._seekable or first <= self._start:
+            return self._rule
+        anchor = max(self._anchor(first), self._start)
+        with self._lock:
+            rule = self._anchored.get(anchor)
+            if rule is None:
+                rule = rrulestr(self._rule_string, dtstart=anchor, cache=True)
+                self._anchored[anchor] = rule
+                if len(self._anchored) > ANCHORED_CACHE_SIZE:
+                    self._anchored.popitem(last=False)
+            else:
+                self._anchored.move_to_end(anchor)
+        return rule
+
+    def find_next_date(self, first_date: date) -> Optional[date]:
+        """Returns first occurrence on or after first_date."""
+        if self.never_occurs:
+            return None
+        first = datetime(first_date.year, first_date.month, first_date.day)
+        next_time = self._rule_from(first).after(first, inc=True)
+        return next_time.date() if next_time else None
+
+    def iter_dates(self, first_date: date):
+        """Yield occurrences on or after first_date."""
+        if self.never_occurs:
+            return
+        first = datetime(first_date.year, first_date.month, first_date.day)
+        last_date = None
+        for next_time in self._rule_from(first).xafter(first, inc=True):
+            # BYHOUR and alike may repeat a date
+            if next_time.date() != last_date:
+                last_date = next_time.date()
+                yield last_date
@@ -0,0 +1,406 @@
+"""Reminder recurrence rule."""
+
+import bisect
+import hashlib
+import weakref
+from array import array
+from datetime import date, time, timedelta
+from typing import Callable, Iterable, Optional, Tuple
+
+from .recurrence import RRuleRecurrence
+
+# Scalar rule fields, in constructor order
+RULE_FIELDS = (
+    "date",
+    "frequency",
+    "period",
+    "first_date",
+    "last_date",
+    "start_time",
+    "end_time",
+    "rrule",
+    "weekdays",
+    "monthdays",
+)
+
+# Occurrences step of each frequency, in days or in months
+_DAYS_STEP = {"daily": 1, "weekly": 7}
+_MONTHS_STEP = {"monthly": 1, "yearly": 12}
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Identical rules are shared by all reminders using them
+_RULES = weakref.WeakValueDictionary()
+
+
+def _days_in_month(year: int, month: int) -> int:
+    """Returns number of days in month."""
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
+def _lowest_bit(mask: int) -> int:
+    """Returns index of the lowest set bit of a mask."""
+    return (mask & -mask).bit_length() - 1
+
+
+def _to_ordinals(dates: Iterable[date]) -> array:
+    """Convert dates to sorted array of unique day ordinals."""
+    return array("i", sorted({day.toordinal() for day in dates}))
+
+
+def _digest(date_sets) -> bytes:
+    """Returns digest of date arrays, to key rules without copying the arrays."""
+    digest = hashlib.sha1()
+    for date_set in date_sets:
+        digest.update(len(date_set).to_bytes(4, "little"))
+        digest.update(date_set)
+    return digest.digest()
+
+
+def _to_runs(dates: Iterable[date]):
+    """Convert dates to sorted arrays of consecutive days runs (start and end ordinals)."""
+    starts = array("i")
+    ends = array("i")
+    for ordinal in _to_ordinals(dates):
+        if ends and ordinal == ends[-1] + 1:
+            ends[-1] = ordinal
+        else:
+            starts.append(ordinal)
+            ends.append(ordinal)
+    return starts, ends
+
+
+class ReminderRule:
+    """Immutable reminder recurrence rule.
+
+    A RRULE, if set, replaces frequency and period. Weekly and monthly rules
+    may recur on several days, given as a weekdays mask (bit 0 is Monday) or
+    a month days mask (bit 0 is the 1st).
+    """
+
+    __slots__ = RULE_FIELDS + (
+        "_exclude_starts",
+        "_exclude_ends",
+        "_include_dates",
+        "_recurrence",
+        "fingerprint",
+        "__weakref__",
+    )
+
+    def __new__(
+        cls,
+        date: Optional[date],
+        frequency: str,
+        period: int,
+        first_date: Optional[date] = None,
+        last_date: Optional[date] = None,
+        start_time: Optional[time] = None,
+        end_time: Optional[time] = None,
+        rrule: Optional[str] = None,
+        weekdays: int = 0,
+        monthdays: int = 0,
+        exclude_dates: Iterable[date] = (),
+        include_dates: Iterable[date] = (),
+    ):
+        """Return rule, shared with identical rules."""
+        exclude_starts, exclude_ends = _to_runs(exclude_dates)
+        return cls._intern(
+            (
+                date,
+                frequency,
+                period,
+                first_date,
+                last_date,
+                start_time,
+                end_time,
+                rrule,
+                weekdays,
+                monthdays,
+            ),
+            (exclude_starts, exclude_ends, _to_ordinals(include_dates)),
+        )
+
+    @classmethod
+    def _intern(cls, values, date_sets):
+        """Return existing rule with same values, or create it."""
+        key = values + (_digest(date_sets),)
+        rule = _RULES.get(key)
+        if rule is None:
+            # Occurrences would never move forward
+            period = values[RULE_FIELDS.index("period")]
+            if period < 1:
+                raise ValueError(f"Invalid period {period}")
+            rule = object.__new__(cls)
+            for name, value in zip(cls.__slots__, values + date_sets):
+                object.__setattr__(rule, name, value)
+            # RRULE is compiled once, shared by all reminders using the rule
+            recurrence = None
+            if rule.rrule and rule.date is not None:
+                recurrence = RRuleRecurrence(rule.rrule, rule.date)
+            object.__setattr__(rule, "_recurrence", recurrence)
+            # Stable across restarts, unlike the rule identity
+            object.__setattr__(
+                rule, "fingerprint", hashlib.sha1(repr(key).encode()).hexdigest()
+            )
+            _RULES[key] = rule
+        return rule
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ReminderRule is immutable")
+
+    def __reduce__(self):
+        """Pickle rule by its values, it is interned again when unpickled."""
+        return (
+            _unpickle_rule,
+            (
+                tuple(getattr(self, name) for name in RULE_FIELDS),
+                (self._exclude_starts, self._exclude_ends, self._include_dates),
+            ),
+        )
+
+    def replace(self, **changes) -> "ReminderRule":
+        """Return rule with changed fields."""
+        values = tuple(changes.pop(name, getattr(self, name)) for name in RULE_FIELDS)
+        if changes:
+            raise TypeError(f"Invalid rule fields {list(changes)}")
+        return self._intern(
+            values, (self._exclude_starts, self._exclude_ends, self._include_dates)
+        )
+
+    @property
+    def all_day(self) -> bool:
+        """True if rule has no time range."""
+        return self.start_time is None and self.end_time is None
+
+    @property
+    def is_recurring(self) -> bool:
+        """True if rule has more than the reminder date."""
+        return self.rrule is not None or self.frequency != "none"
+
+    @property
+    def has_date_sets(self) -> bool:
+        """True if rule has exclude or include dates."""
+        return bool(self._exclude_starts or self._include_dates)
+
+    @property
+    def active_range(self) -> Optional[Tuple[date, date]]:
+        """Return (first, last) dates bounding rule occurrences, None if it has none.
+
+        Last date is date.max if occurrences are unbounded.
+        """
+        first_date = last_date = None
+        if self.date is not None:
+            if self.is_recurring:
+                first_date = max(self.date, self.first_date or self.date)
+                last_date = self.last_date or date.max
+            else:
+                first_date = last_date = self.date
+                if self.first_date and self.date < self.first_date:
+                    first_date = None
+            if first_date is not None and self.last_date and first_date > self.last_date:
+                first_date = None
+        if self._include_dates:
+            first_include = date.fromordinal(self._include_dates[0])
+            last_include = date.fromordinal(self._include_dates[-1])
+            if first_date is None:
+                first_date, last_date = first_include, last_include
+            else:
+                first_date = min(first_date, first_include)
+                last_date = max(last_date, last_include)
+        if first_date is None:
+            return None
+        return first_date, last_date
+
+    def is_excluded(self, d: date) -> bool:
+        """True if date is one of the exclude dates."""
+        return self._exclude_run_end(d) is not None
+
+    def _exclude_run_end(self, d: date) -> Optional[date]:
+        """Returns last date of the excluded days run containing given date."""
+        ordinal = d.toordinal()
+        index = bisect.bisect_right(self._exclude_starts, ordinal) - 1
+        if index < 0 or self._exclude_ends[index] < ordinal:
+            return None
+        return date.fromordinal(self._exclude_ends[index])
+
+    @property
+    def days_mask(self) -> int:
+        """Returns the days mask used by the rule frequency, 0 if none."""
+        if self.frequency == "weekly":
+            return self.weekdays
+        if self.frequency == "monthly":
+            return self.monthdays
+        return 0
+
+    def _next_weekdays_date(self, first_date: date) -> date:
+        """Returns first date on or after first_date on one of the weekdays."""
+        # Weeks start on Monday, the reminder date week is active
+        anchor = self.date.toordinal() - self.date.weekday()
+        week, weekday = divmod(max(first_date, self.date).toordinal() - anchor, 7)
+        if week % self.period == 0:
+            days = self.weekdays >> weekday << weekday
+            if days:
+                return date.fromordinal(anchor + week * 7 + _lowest_bit(days))
+            week += 1
+        week += -week % self.period
+        return date.fromordinal(anchor + week * 7 + _lowest_bit(self.weekdays))
+
+    def _month_mask(self, year: int, month: int) -> int:
+        """Returns month days mask of a month, days past month end clamped to its last day."""
+        days_in_month = _days_in_month(year, month)
+        mask = self.monthdays & ((1 << days_in_month) - 1)
+        if self.monthdays >> days_in_month:
+            mask |= 1 << (days_in_month - 1)
+        return mask
+
+    def _next_monthdays_date(self, first_date: date) -> date:
+        """Returns first date on or after first_date on one of the month days."""
+        first_date = max(first_date, self.date)
+        anchor = self.date.year * 12 + self.date.month - 1
+        month_index = first_date.year * 12 + first_date.month - 1
+        day = first_date.day - 1
+        if (month_index - anchor) % self.period:
+            month_index += -(month_index - anchor) % self.period
+            day = 0
+        # Every month has a day in the mask, found in this month or the next active one
+        while True:
+            year, month = divmod(month_index, 12)
+            days = self._month_mask(year, month + 1) >> day << day
+            if days:
+                return date(year, month + 1, _lowest_bit(days) + 1)
+            month_index += self.period
+            day = 0
+
+    def _next_masked_date(self, first_date: date) -> date:
+        """Returns first date on or after first_date on one of the rule days."""
+        if self.frequency == "weekly":
+            return self._next_weekdays_date(first_date)
+        return self._next_monthdays_date(first_date)
+
+    def _first_index(self, first_date: date) -> int:
+        """Returns index of the first occurrence on or after first_date."""
+        if first_date <= self.date:
+            return 0
+        if self.frequency in ("daily", "weekly"):
+            step = _DAYS_STEP[self.frequency] * self.period
+            return -((self.date.toordinal() - first_date.toordinal()) // step)
+        step = _MONTHS_STEP[self.frequency] * self.period
+        month_index = self.date.year * 12 + self.date.month - 1
+        index = -((month_index - (first_date.year * 12 + first_date.month - 1)) // step)
+        # Day may be clamped before first date, in first date month
+        if self._occurrence(index) < first_date:
+            index += 1
+        return index
+
+    def _occurrence(self, index: int) -> date:
+        """Returns occurrence date by its index (reminder date index is 0)."""
+        if self.frequency in ("daily", "weekly"):
+            step = _DAYS_STEP[self.frequency] * self.period
+            return date.fromordinal(self.date.toordinal() + index * step)
+        step = _MONTHS_STEP[self.frequency] * self.period
+        year, month = divmod(self.date.year * 12 + self.date.month - 1 + index * step, 12)
+        return date(year, month + 1, min(self.date.day, _days_in_month(year, month + 1)))
+
+    def find_next_date(self, first_date: date) -> Optional[date]:
+        """Returns reminder next date occurrence (including reminder date)."""
+        if self.date is None:
+            return None
+        if self._recurrence is not None:
+            return self._recurrence.find_next_date(first_date)
+        if self.days_mask:
+            return self._next_masked_date(first_date)
+        if self.frequency == "none":
+            return None if self.date < first_date else self.date
+        return self._occurrence(self._first_index(first_date))
+
+    def _iter_next_dates(self, first_date: date):
+        """Yield reminder recurrence dates, starting at first_date (including it)."""
+        if self.date is None:
+            return
+        if self._recurrence is not None:
+            yield from self._recurrence.iter_dates(first_date)
+            return
+        if self.days_mask:
+            next_date = self._next_masked_date(first_date)
+            while True:
+                yield next_date
+                next_date = self._next_masked_date(next_date + timedelta(days=1))
+        if self.frequency == "none":
+            if first_date <= self.date:
+                yield self.date
+            return
+        index = self._first_index(first_date)
+        if self.frequency in ("daily", "weekly"):
+            # Days based frequencies step on ordinals
+            step = _DAYS_STEP[self.frequency] * self.period
+            ordinal = self.date.toordinal() + index * step
+            while True:
+                yield date.fromordinal(ordinal)
+                ordinal += step
+        else:
+            while True:
+                yield self._occurrence(index)
+                index += 1
+
+    def _iter_recurrence(self, first_date: date, on_skip: Optional[Callable] = None):
+        """Yield reminder dates within rule date range, skipping exclude dates."""
+        if self.first_date and first_date < self.first_date:
+            first_date = self.first_date
+        next_dates = self._iter_next_dates(first_date)
+        next_date = next(next_dates, None)
+        while next_date is not None:
+            if self.last_date and next_date > self.last_date:
+                return
+            # Remove exclude dates (one time reminder is never excluded)
+            skip_date = None
+            if self.is_recurring:
+                skip_date = self._exclude_run_end(next_date)
+            if skip_date is not None:
+                # Skip the whole excluded days run at once
+                if on_skip is not None:
+                    on_skip()
+                next_dates = self._iter_next_dates(skip_date + timedelta(days=1))
+            else:
+                yield next_date
+            next_date = next(next_dates, None)
+
+    def iter_include_dates(self, first_date: date, last_date: Optional[date] = None):
+        """Yield include dates between first_date and last_date (including both)."""
+        index = bisect.bisect_left(self._include_dates, first_date.toordinal())
+        end = len(self._include_dates)
+        if last_date:
+            end = bisect.bisect_right(self._include_dates, last_date.toordinal(), index)
+        for i in range(index, end):
+            yield date.fromordinal(self._include_dates[i])
+
+    def iter_occurrences(
+        self,
+        first_date: date,
+        last_date: Optional[date] = None,
+        on_skip: Optional[Callable] = None,
+    ):
+        """Yield reminder occurrences between first_date and last_date (including both).
+
+        on_skip is called for each skip over excluded dates.
+        """
+        include_dates = self.iter_include_dates(first_date, last_date)
+        include_date = next(include_dates, None)
+        for next_date in self._iter_recurrence(first_date, on_skip):
+            if last_date and next_date > last_date:
+                break
+            # Merge include dates preceding the next occurrence
+            while include_date is not None and include_date <= next_date:
+                if include_date < next_date:
+                    yield include_date
+                include_date = next(include_dates, None)
+            yield next_date
+        while include_date is not None:
+            yield include_date
+            include_date = next(include_dates, None)
+
+
+def _unpickle_rule(values, date_sets) -> ReminderRule:
+    """Returns unpickled rule."""
+    return ReminderRule._intern(values, date_sets)
@@ -0,0 +1,93 @@
+"""Shared update scheduler for reminders."""
+
+import heapq
+import itertools
+import logging
+from datetime import datetime
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_point_in_time
+
+from .tick import UpdateTick
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ReminderScheduler:
+    """Single timer scheduling the updates of all reminders."""
+
+    def __init__(self, hass, async_update_action):
+        """Initialize an empty scheduler, updating due entities with given action."""
+        self._hass = hass
+        self._async_update_action = async_update_action
+        self._heap = []
+        self._scheduled = {}
+        self._counter = itertools.count()
+        self._unsub_timer = None
+        self._timer_time = None
+
+    @callback
+    def async_schedule(self, entity, update_time: datetime) -> None:
+        """Schedule entity update at given (local) time, replacing previous one."""
+        seq = next(self._counter)
+        self._scheduled[entity.entity_id] = seq
+        heapq.heappush(self._heap, (update_time, seq, entity))
+        if self._timer_time is None or update_time < self._timer_time:
+            self._set_timer(update_time)
+
+    @callback
+    def async_cancel(self, entity) -> None:
+        """Cancel entity scheduled update."""
+        # Heap entry is dropped when it reaches the top
+        self._scheduled.pop(entity.entity_id, None)
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel all scheduled updates."""
+        if self._unsub_timer:
+            self._unsub_timer()
+        self._unsub_timer = None
+        self._timer_time = None
+        self._heap = []
+        self._scheduled = {}
+
+    def _is_current(self, seq, entity) -> bool:
+        """True if heap entry is the entity latest schedule."""
+        return self._scheduled.get(entity.entity_id) == seq
+
+    def _set_timer(self, update_time: datetime) -> None:
+        """Set the single timer to given time."""
+        if self._unsub_timer:
+            self._unsub_timer()
+        self._timer_time = update_time
+        self._unsub_timer = async_track_point_in_time(
+            self._hass, self._async_run, update_time.astimezone()
+        )
+
+    async def _async_run(self, _) -> None:
+        """Update all due entities in one pass, then set the timer to the next one."""
+        self._unsub_timer = None
+        self._timer_time = None
+        # Single clock read for all due entities
+        tick = UpdateTick()
+        due = []
+        while self._heap and self._heap[0][0] <= tick.now:
+            _, seq, entity = heapq.heappop(self._heap)
+            if self._is_current(seq, entity):
+                del self._scheduled[entity.entity_id]
+                due.append(entity)
+        _LOGGER.debug("Updating %d reminders", len(due))
+        try:
+            if due:
+                await self._async_update_action(due, tick)
+        finally:
+            # Timer is set again even if the update failed
+            self._set_next_timer()
+
+    def _set_next_timer(self) -> None:
+        """Set the timer to the next scheduled update, if any."""
+        # Drop canceled entries before setting the timer
+        while self._heap and not self._is_current(self._heap[0][1], self._heap[0][2]):
+            heapq.heappop(self._heap)
+        if self._heap and self._heap[0][0] != self._timer_time:
+            self._set_timer(self._heap[0][0])
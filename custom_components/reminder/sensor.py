@@ -1,18 +1,19 @@
 """Sensor platform for reminders."""
 
 import asyncio
+import hashlib
+import itertools
 import logging
 
-from typing import Any, List, Optional, Union
+from typing import Any, Iterable, List, Optional
 
 from datetime import date, datetime, time, timedelta
 
 from dateutil.parser import parse
-from dateutil.relativedelta import relativedelta
 
+from homeassistant.core import callback
 from homeassistant.exceptions import TemplateError
 
-from homeassistant.helpers.discovery import async_load_platform
 from homeassistant.helpers.restore_state import RestoreEntity
 
 from homeassistant.const import (
@@ -23,7 +24,15 @@ from homeassistant.const import (
     STATE_OFF
 )
 
-from .calendar import EntitiesCalendarData
+from .batch import is_batch_available
+from .calendar import (
+    async_add_to_calendar,
+    async_remove_from_calendar,
+    async_write_calendars_state,
+)
+from .rule import ReminderRule
+from .snapshot import UNKNOWN
+from .tick import UpdateTick
 
 from .const import (
     ATTR_NEXT_DATE,
@@ -42,6 +51,10 @@ from .const import (
     CONF_PERIOD,
     CONF_PERIOD_TEMPLATE,
     CONF_PREFIX,
+    CONF_RRULE,
+    CONF_WEEKDAYS,
+    CONF_MONTHDAYS,
+    CONF_SENSORS,
     CONF_FIRST_DATE,
     CONF_FREQUENCY,
     CONF_FREQUENCY_TEMPLATE,
@@ -55,9 +68,17 @@ from .const import (
     CONF_VERBOSE_FORMAT,
     DEVICE_CLASS,
     DOMAIN,
+    DOMAIN_ADD_ENTITIES,
+    DOMAIN_BATCH,
     DOMAIN_CONFIG,
+    DOMAIN_SCHEDULER,
+    DOMAIN_SNAPSHOT,
+    DOMAIN_STATS,
+    DOMAIN_TEMPLATES,
     ENTITY_ID_FORMAT,
     ENTITY_ID_PREFIX_FORMAT,
+    FREQUENCY_OPTIONS,
+    WEEKDAY_OPTIONS,
     SENSOR_PLATFORM,
 )
 
@@ -65,10 +86,166 @@ _LOGGER = logging.getLogger(__name__)
 
 SCAN_INTERVAL = timedelta(seconds=60)
 
+# Time ranges crossing midnight end with the reminder date
+_END_OF_DAY = time(23, 59, 59)
+
+# Unique version of reminders recurrence rules, used as cache key
+_RULE_VERSIONS = itertools.count()
+
+# Next date not found yet
+_FIND_NEXT_DATE = object()
+
+
+def config_fingerprint(hass, config) -> str:
+    """Returns hash of reminder configuration, and of entity ID prefix."""
+    prefix = hass.data[DOMAIN][DOMAIN_CONFIG].get(CONF_PREFIX)
+    return hashlib.sha1(repr((prefix, sorted(config.items()))).encode()).hexdigest()
+
+
+def _create_reminders(hass, configs) -> list:
+    """Create reminders entities, skipping (and logging) invalid configurations."""
+    entities = []
+    for config in configs:
+        try:
+            entities.append(ReminderSensor(hass, config))
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Invalid reminder %s", config.get(CONF_NAME))
+    return entities
+
 
 async def async_setup_platform(hass, _, async_add_entities, discovery_info=None):
     """Create reminders entities defined in YAML and add them to HA."""
-    async_add_entities([ReminderSensor(hass, discovery_info)], True)
+    if discovery_info is None:
+        return
+    # Kept to add reminders on reload
+    hass.data[DOMAIN][DOMAIN_ADD_ENTITIES] = async_add_entities
+    entities = _create_reminders(hass, discovery_info[CONF_SENSORS])
+    snapshot = hass.data[DOMAIN].get(DOMAIN_SNAPSHOT)
+    if snapshot is not None:
+        snapshot.async_prune(entity.entity_id for entity in entities)
+    await _async_add_reminders(hass, entities)
+
+
+async def async_reload_reminders(hass, configs) -> None:
+    """Replace reminders by the given configurations.
+
+    Only reminders whose configuration fingerprint changed are removed and
+    created again, others are left untouched.
+    """
+    current = {
+        entity.config_fingerprint: entity
+        for entity in hass.data[DOMAIN].get(SENSOR_PLATFORM, {}).values()
+    }
+    configs = {config_fingerprint(hass, config): config for config in configs}
+    removed = [
+        entity for fingerprint, entity in current.items() if fingerprint not in configs
+    ]
+    for entity in removed:
+        await entity.async_remove()
+    new_configs = [
+        config for fingerprint, config in configs.items() if fingerprint not in current
+    ]
+    added = _create_reminders(hass, new_configs)
+    _LOGGER.debug(
+        "Reloading reminders, %d removed, %d added, %d unchanged",
+        len(removed),
+        len(added),
+        len(configs) - len(new_configs),
+    )
+    snapshot = hass.data[DOMAIN].get(DOMAIN_SNAPSHOT)
+    if snapshot is not None:
+        snapshot.async_prune(
+            [entity.entity_id for entity in hass.data[DOMAIN].get(SENSOR_PLATFORM, {}).values()]
+            + [entity.entity_id for entity in added]
+        )
+    if added:
+        await _async_add_reminders(hass, added)
+
+
+async def _async_add_reminders(hass, entities) -> None:
+    """Find reminders next dates and add them to HA."""
+    for entity in entities:
+        entity.hass = hass
+    tick = UpdateTick()
+    # Reminders with unchanged rules come back from the last run snapshot
+    restored = {}
+    snapshot = hass.data[DOMAIN].get(DOMAIN_SNAPSHOT)
+    if snapshot is not None:
+        for entity in entities:
+            if entity.has_templates:
+                continue
+            next_date = snapshot.get_next_date(
+                entity.entity_id, entity.rule.fingerprint, tick.date
+            )
+            if next_date is not UNKNOWN:
+                restored[entity] = next_date
+    failed = set()
+    for entity, next_date in restored.items():
+        # Recomputed in the background, by the scheduler, once added
+        entity._restored = True
+        try:
+            await entity._async_update(tick, next_date)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Update for %s fails", entity.entity_id)
+            failed.add(entity)
+    # Find all other initial next dates in one pass, as of the same time
+    failed.update(
+        await async_update_reminders(
+            hass, [entity for entity in entities if entity not in restored], tick
+        )
+    )
+    # A failing reminder is not added, the others are
+    entities = [entity for entity in entities if entity not in failed]
+    _LOGGER.debug("Adding %d reminders, %d restored", len(entities), len(restored))
+    hass.data[DOMAIN][DOMAIN_STATS].increment("snapshot_restores", count=len(restored))
+    hass.data[DOMAIN][DOMAIN_ADD_ENTITIES](entities)
+
+
+async def async_update_reminders(hass, entities, tick: UpdateTick) -> list:
+    """Update reminders in one pass, as of the same clock tick.
+
+    Next dates of large populations are found by the batch engine, except for
+    reminders with templates (their rules may change by the update). A failing
+    reminder does not stop the others, failing reminders are returned.
+    """
+    next_dates = {}
+    static_entities = [entity for entity in entities if not entity.has_templates]
+    if is_batch_available(len(static_entities)):
+        try:
+            with hass.data[DOMAIN][DOMAIN_STATS].timer("batch_find_next_dates"):
+                found = hass.data[DOMAIN][DOMAIN_BATCH].find_next_dates(
+                    [entity.rule for entity in static_entities], tick.date
+                )
+            next_dates = dict(zip(static_entities, found))
+        except Exception:  # pylint: disable=broad-except
+            # Next dates are found one by one instead
+            _LOGGER.exception("Batch update of %d reminders fails", len(static_entities))
+    failed = []
+    for entity in entities:
+        try:
+            await entity._async_update(tick, next_dates.get(entity, _FIND_NEXT_DATE))
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Update for %s fails", entity.entity_id)
+            failed.append(entity)
+    return failed
+
+
+async def async_scheduled_update_reminders(hass, entities, tick: UpdateTick) -> None:
+    """Update reminders at their transition time and schedule their next one."""
+    try:
+        await async_update_reminders(hass, entities, tick)
+    finally:
+        # Every updated reminder is scheduled again, even if some update failed
+        for entity in entities:
+            try:
+                entity.async_write_ha_state_if_changed()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Update for %s fails", entity.entity_id)
+            entity.async_schedule_update(tick)
+        # Calendars turn on and off at their reminders transitions
+        async_write_calendars_state(
+            hass, {entity.calendar for entity in entities if not entity.hidden}
+        )
 
 
 class ReminderSensor(RestoreEntity):
@@ -76,7 +253,8 @@ class ReminderSensor(RestoreEntity):
 
     def __init__(self, hass, config, title=None):
         """Initialize the Template Media player."""
-        self._config = config
+        self._unique_id = config.get("unique_id")
+        self._config_fingerprint = config_fingerprint(hass, config)
         self._hass = hass
         self._hidden = config.get(ATTR_HIDDEN, False)
         self._calendar = config.get(CONF_CALENDAR)
@@ -86,30 +264,43 @@ class ReminderSensor(RestoreEntity):
         self._description = config.get(CONF_DESCRIPTION)
         self._next_date = None
         self._remaining = 0
+        self._last_tick = None
+        self._restored = False
+        self._attributes = None
+        self._attributes_key = None
+        self._written_state = None
         self._tag = config.get(CONF_TAG)
-        self._period = config.get(CONF_PERIOD)
         self._period_template = config.get(CONF_PERIOD_TEMPLATE)
         self._verbose_format = config.get(CONF_VERBOSE_FORMAT)
         self._state = STATE_OFF
         self._icon = config.get(CONF_ICON)
         self._icon_on = config.get(CONF_ICON_ON)
         self._icon_off = config.get(CONF_ICON_OFF)
-        self._frequency = config.get(CONF_FREQUENCY)
         self._frequency_template = config.get(CONF_FREQUENCY_TEMPLATE)
         self._date_format = config.get(CONF_DATE_FORMAT)
-        self._date = self._to_date(config.get(CONF_DATE))
         self._date_template = config.get(CONF_DATE_TEMPLATE)
         self._time_format = config.get(CONF_TIME_FORMAT)
-        self._start_time = self._to_time(config.get(CONF_START_TIME))
-        self._end_time = self._to_time(config.get(CONF_END_TIME))
-        self._last_date = self._to_date(config.get(CONF_LAST_DATE))
-        self._first_date = self._to_date(config.get(CONF_FIRST_DATE))
-        self._exclude_dates = self._to_dates(config.get(CONF_EXCLUDE_DATES, []))
-        self._include_dates = self._to_dates(config.get(CONF_INCLUDE_DATES, []))
+        self._rule = ReminderRule(
+            date=self._to_date(config.get(CONF_DATE)),
+            frequency=config.get(CONF_FREQUENCY),
+            period=config.get(CONF_PERIOD),
+            first_date=self._to_date(config.get(CONF_FIRST_DATE)),
+            last_date=self._to_date(config.get(CONF_LAST_DATE)),
+            start_time=self._to_time(config.get(CONF_START_TIME)),
+            end_time=self._to_time(config.get(CONF_END_TIME)),
+            rrule=config.get(CONF_RRULE),
+            weekdays=self._to_mask(
+                WEEKDAY_OPTIONS.index(day) for day in config.get(CONF_WEEKDAYS, [])
+            ),
+            monthdays=self._to_mask(day - 1 for day in config.get(CONF_MONTHDAYS, [])),
+            exclude_dates=self._to_dates(config.get(CONF_EXCLUDE_DATES, [])),
+            include_dates=self._to_dates(config.get(CONF_INCLUDE_DATES, [])),
+        )
         self._prefix = self._hass.data[DOMAIN][DOMAIN_CONFIG].get(CONF_PREFIX)
-        for template in (self._period_template,
-           self._frequency_template,
-        ):
+        self._rule_version = next(_RULE_VERSIONS)
+        self._poll = False
+        self._unsub_templates = []
+        for template in self._templates_dict.values():
             if template is not None:
                 template.hass = hass
 
@@ -122,24 +313,54 @@ class ReminderSensor(RestoreEntity):
             self.hass.data[DOMAIN][SENSOR_PLATFORM] = {}
         self.hass.data[DOMAIN][SENSOR_PLATFORM][self.entity_id] = self
 
-        state = await self.async_get_last_state()
+        if not self.hidden:
+            async_add_to_calendar(self.hass, self)
+            self._update_calendar()
 
+        # Update when templates entities change
+        for template in self._templates_dict.values():
+            if template is None:
+                continue
+            unsub = self.hass.data[DOMAIN][DOMAIN_TEMPLATES].async_subscribe(
+                template, self._async_template_changed
+            )
+            if unsub is None:
+                self._poll = True
+            else:
+                self._unsub_templates.append(unsub)
+
+        if self._restored:
+            # Next date came from the snapshot, recompute it as soon as possible
+            self._restored = False
+            self.hass.data[DOMAIN][DOMAIN_SCHEDULER].async_schedule(self, datetime.now())
+        elif not self.should_poll:
+            self.async_schedule_update()
+
+    async def async_will_remove_from_hass(self):
+        """Cancel scheduled update when sensor is removed."""
+        self.hass.data[DOMAIN][DOMAIN_SCHEDULER].async_cancel(self)
+        self.hass.data[DOMAIN][DOMAIN_STATS].remove_entity(self.entity_id)
+        if self.hass.data[DOMAIN][SENSOR_PLATFORM].get(self.entity_id) is self:
+            del self.hass.data[DOMAIN][SENSOR_PLATFORM][self.entity_id]
         if not self.hidden:
-            if CALENDAR_PLATFORM not in self.hass.data[DOMAIN]:
-                self.hass.data[DOMAIN][CALENDAR_PLATFORM] = EntitiesCalendarData(
-                    self.hass
-                )
-                _LOGGER.debug(f"Creating {self.calendar} calendar")
-                self.hass.async_create_task(
-                    async_load_platform(
-                        self.hass,
-                        CALENDAR_PLATFORM,
-                        DOMAIN,
-                        {"name": self.calendar},
-                        {"name": self.calendar},
-                    )
-                )
-            self.hass.data[DOMAIN][CALENDAR_PLATFORM].add_entity(self.entity_id)
+            async_remove_from_calendar(self.hass, self)
+        for unsub in self._unsub_templates:
+            unsub()
+        self._unsub_templates = []
+
+    @property
+    def should_poll(self):
+        """Poll only reminders with untrackable templates, others schedule their own updates."""
+        return self._poll
+
+    @callback
+    def _async_template_changed(self) -> None:
+        """Update sensor when one of its templates result changed.
+
+        Reminders sharing the template are due together, the scheduler updates
+        them in one batch, with a single clock tick.
+        """
+        self.hass.data[DOMAIN][DOMAIN_SCHEDULER].async_schedule(self, datetime.now())
 
     @property
     def entity_id(self):
@@ -152,8 +373,8 @@ class ReminderSensor(RestoreEntity):
     def device_info(self):
         """Return device info."""
         return {
-            "identifiers": {(DOMAIN, self._config.get("unique_id", None))},
-            "name": self._config.get("name"),
+            "identifiers": {(DOMAIN, self._unique_id)},
+            "name": self._name,
             "manufacturer": "Reminders",
         }
 
@@ -188,7 +409,15 @@ class ReminderSensor(RestoreEntity):
 
     @property
     def device_state_attributes(self):
-        """Return the sensor attributes."""
+        """Return the sensor attributes, computed once per next date or remaining days change."""
+        key = (self._next_date, self._remaining)
+        if key != self._attributes_key:
+            self._attributes = self._state_attributes()
+            self._attributes_key = key
+        return self._attributes
+
+    def _state_attributes(self):
+        """Build the sensor attributes."""
         attribs = {}
         if self._next_date:
             if self.all_day:
@@ -228,30 +457,69 @@ class ReminderSensor(RestoreEntity):
     @property
     def start_time(self):
         """Return reminder start time."""
-        if self._start_time:
-            return self._start_time
-        return self._to_time("00:00")
+        if self._rule.start_time:
+            return self._rule.start_time
+        return time()
 
     @property
     def end_time(self):
-        """Return reminder end time."""
-        if self._end_time and self._end_time < self.start_time:
-            return self.start_time + datetime.timedelta(hours=1)
-        return self._end_time
+        """Return reminder end time, the end of day if the range crosses midnight."""
+        if self._rule.end_time and self._rule.end_time < self.start_time:
+            return _END_OF_DAY
+        return self._rule.end_time
 
     @property
     def all_day(self) -> bool:
-        return self._start_time is None and self._end_time is None
+        return self._rule.all_day
 
     @property
     def calendar(self) -> str:
         return self._calendar
 
+    @property
+    def config_fingerprint(self) -> str:
+        """Return hash of reminder configuration."""
+        return self._config_fingerprint
+
+    @property
+    def rule(self) -> ReminderRule:
+        """Return reminder recurrence rule."""
+        return self._rule
+
+    @property
+    def has_templates(self) -> bool:
+        """True if reminder rule values are rendered by templates."""
+        return any(template is not None for template in self._templates_dict.values())
+
+    @property
+    def rule_version(self) -> int:
+        """Return reminder recurrence rule version, changed whenever the rule changes."""
+        return self._rule_version
+
     @property
     def _templates_dict(self):
-        return {'_period': self._period_template,
-            '_date': self._date_template,
-            '_frequency': self._frequency_template}
+        return {'period': self._period_template,
+            'date': self._date_template,
+            'frequency': self._frequency_template}
+
+    def _set_template_value(self, property_name: str, value: Any) -> None:
+        """Set rule value rendered by template, and change rule version if value changed."""
+        try:
+            if property_name == "date" and isinstance(value, str):
+                value = self._to_date(value)
+            elif property_name == "period":
+                value = int(value)
+                if value < 1:
+                    raise ValueError(f"period {value} is not positive")
+            elif property_name == "frequency" and value not in FREQUENCY_OPTIONS:
+                raise ValueError(f"unknown frequency {value}")
+        except ValueError as ex:
+            _LOGGER.error('Invalid %s template value %s: %s',
+                property_name, self._name, ex)
+            return
+        if value != getattr(self._rule, property_name):
+            self._rule = self._rule.replace(**{property_name: value})
+            self._rule_version = next(_RULE_VERSIONS)
 
     def _to_date(self, value: Any) -> str:
         """Convert str to dat."""
@@ -269,6 +537,14 @@ class ReminderSensor(RestoreEntity):
                 continue
         return converted
 
+    @staticmethod
+    def _to_mask(bits: Iterable[int]) -> int:
+        """Convert bit indexes to a days mask."""
+        mask = 0
+        for bit in bits:
+            mask |= 1 << bit
+        return mask
+
     def _to_time(self, value: Any) -> str:
         """Convert str to time."""
         if value is None or value == "":
@@ -280,140 +556,130 @@ class ReminderSensor(RestoreEntity):
         if not d:
             return False
         inside = True
-        if self._first_date and d < self._first_date:
+        if self._rule.first_date and d < self._rule.first_date:
             inside = False
-        if self._last_date and d > self._last_date:
+        if self._rule.last_date and d > self._rule.last_date:
             inside = False
         return inside
 
-    def _is_time_in_range(self, t: datetime) -> bool:
+    def _is_time_in_range(self, t: time) -> bool:
         """True if given time is within reminder time range."""
         if not t:
             return True
         inside = True
-        if self.start_time and t.time() < self.start_time:
+        if self.start_time and t < self.start_time:
             inside = False
-        if self.end_time and t.time() > self.end_time:
+        if self.end_time and t > self.end_time:
             inside = False
         return inside
 
-    def _next_date_none(self, first_date: date):
-        """Returns single occurrence reminder next date (including reminder date)."""
-        if self._date < first_date:
-            return None
-        return self._date
-
-    def _next_date_daily(self, first_date: date):
-        """Returns daily reminder next date occurrence (including reminder date)."""
-        if first_date < self._date:
-            return self._date
-        # Move reminder to first date range
-        days_diff = (first_date - self._date).days
-        days_delta = self._period * int(days_diff / self._period)
-        next_date = self._date + relativedelta(days=days_delta)
-        # If passed, move to next occurence
-        if next_date < first_date:
-            next_date += relativedelta(days=self._period)
-        return next_date
-        
-    def _next_date_weekly(self, first_date: date):
-        """Returns weekly reminder next date occurrence."""
-        if first_date < self._date:
-            return self._date        
-        next_date = first_date + relativedelta(days=(self._date.weekday() - first_date.weekday()))
-        if next_date < first_date:
-            next_date += relativedelta(days=(7 * self._period))
-        return next_date
-
-    def _next_date_monthly(self, first_date: date):
-        """Returns monthly reminder next date occurrence (including reminder date)."""
-        if first_date < self._date:
-            return self._date
-        # Move reminder date to first date range
-        month_date = datetime(first_date.year, first_date.month, self._date.day)
-        months_diff = (month_date.year - self._date.year) * 12 + month_date.month - self._date.month
-        months_delta = self._period * int(months_diff / self._period)
-        next_date = self._date + relativedelta(months=months_delta)
-        # If passed, move to next occurence
-        if next_date < first_date:
-            next_date += relativedelta(months=self._period)
-        return next_date
-
-    def _next_date_yearly(self, first_date: date):
-        """Returns yearly reminder next date occurrence (including reminder date)."""
-        if first_date < self._date:
-            return self._date
-        # Move reminder date to first date range
-        year_date = datetime(first_date.year, self._date.month, self._date.day)
-        years_diff = year_date.year - self._date.year
-        years_delta = self._period * int(years_diff / self._period)
-        next_date = self._date + relativedelta(years=years_delta)
-        # If passed, move to next occurence
-        if next_date < first_date:
-            next_date += relativedelta(years=self._period)
-        return next_date
-
-    def _find_next_date(self, first_date: date):
-        """Returns reminder next date occurrence (including reminder date)."""
-        if self._frequency == "none":
-            return self._next_date_none(first_date)
-        elif self._frequency == "daily":
-            return self._next_date_daily(first_date)
-        elif self._frequency == "weekly":
-            return self._next_date_weekly(first_date)
-        elif self._frequency == "monthly":
-            return self._next_date_monthly(first_date)
-        elif self._frequency == "yearly":
-            return self._next_date_yearly(first_date)
-
-    def _insert_include_date(self, first_date: date, next_date: Union[date, None]) -> Union[date, None]:
-        """Add include dates."""
-        include_dates = list(filter(lambda date: date >= first_date, self._include_dates))
-        if len(include_dates) > 0 and (
-            next_date is None or include_dates[0] < next_date
-        ):
-            _LOGGER.debug(
-                "(%s) Inserting include_date %s", self._name, include_dates[0]
-            )
-            return include_dates[0]
-        return next_date
+    def iter_occurrences(self, first_date: date, last_date: Optional[date] = None):
+        """Yield reminder occurrences between first_date and last_date (including both)."""
+        return self._rule.iter_occurrences(first_date, last_date)
 
     async def async_find_next_date(self, first_date: date, ignore_today=False):
         """Get date within configured date range."""
-        day1 = first_date
-        next_date = None
-        while next_date is None:
-            next_date = self._find_next_date(day1)
-            # One time reminder
-            if self._frequency == "none":
-                break
-            # Remove exclude dates
-            if next_date in self._exclude_dates:
-                _LOGGER.debug(
-                    "(%s) Skipping exclude_date %s", self._name, next_date
-                )
-                next_date = None
-            # Look from the next day
-            day1 += relativedelta(days=1)
-        if self._first_date and next_date < self._first_date:
-            next_date = self._find_next_date(self._first_date)
-        if self._last_date and next_date > self._last_date:
-            next_date = None
-        next_date = self._insert_include_date(first_date, next_date)
-        return next_date
+        stats = self.hass.data[DOMAIN][DOMAIN_STATS]
+        with stats.timer("find_next_date", self.entity_id):
+            return next(
+                self._rule.iter_occurrences(
+                    first_date,
+                    on_skip=lambda: stats.increment("exclude_skips", self.entity_id),
+                ),
+                None,
+            )
+
+    @callback
+    def _update_calendar(self) -> None:
+        """Update reminder next date in the calendar next events index."""
+        data = self.hass.data[DOMAIN].get(CALENDAR_PLATFORM, {}).get(self.calendar)
+        if self.hidden or data is None:
+            return
+        data.set_rule(self.entity_id, self._rule)
+        data.set_next_date(self.entity_id, self._next_date)
+
+    @callback
+    def _update_snapshot(self, next_date: Optional[date]) -> None:
+        """Store reminder next date in the snapshot, if its rule is not templated."""
+        snapshot = self.hass.data[DOMAIN].get(DOMAIN_SNAPSHOT)
+        if snapshot is None or self.has_templates:
+            return
+        snapshot.async_set(self, next_date)
+
+    def _next_update_time(self, tick: UpdateTick) -> datetime:
+        """Returns next time reminder state or attributes may change."""
+        # Remaining days change at midnight
+        next_update = datetime.combine(tick.date + timedelta(days=1), time())
+        if self._next_date and self._next_date.date() == tick.date and not self.all_day:
+            for transition in (self.start_time, self.end_time):
+                if transition is None:
+                    continue
+                transition_time = datetime.combine(tick.date, transition)
+                if transition == self.end_time:
+                    # Reminder is on until end time passed
+                    transition_time += timedelta(seconds=1)
+                if tick.now < transition_time < next_update:
+                    next_update = transition_time
+        return next_update
+
+    @callback
+    def async_schedule_update(self, tick: Optional[UpdateTick] = None) -> None:
+        """Schedule sensor update at its next transition time.
+
+        Without a tick, the tick of the last update is used.
+        """
+        next_update = self._next_update_time(tick or self._last_tick or UpdateTick())
+        self.hass.data[DOMAIN][DOMAIN_SCHEDULER].async_schedule(self, next_update)
+
+    @callback
+    def async_write_ha_state_if_changed(self) -> None:
+        """Write the state only if state or attributes changed since last write."""
+        written_state = (self._state, self._next_date, self._remaining)
+        if written_state == self._written_state:
+            self.hass.data[DOMAIN][DOMAIN_STATS].increment("state_writes_skipped")
+            return
+        self._written_state = written_state
+        self.hass.data[DOMAIN][DOMAIN_STATS].increment("state_writes")
+        self.async_write_ha_state()
+
+    async def async_update_ha_state(self, force_refresh=False):
+        """Update the state (polled reminders), writing it only if changed."""
+        if force_refresh:
+            try:
+                await self.async_device_update()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Update for %s fails", self.entity_id)
+                return
+        self.async_write_ha_state_if_changed()
+        if not self.hidden:
+            async_write_calendars_state(self.hass, [self.calendar])
 
     async def async_update(self) -> None:
         """Get the latest data and updates the states."""
+        await self._async_update(UpdateTick())
+
+    async def _async_update(self, tick: UpdateTick, next_date=_FIND_NEXT_DATE) -> None:
+        """Update the states as of given clock tick, with next date if already found."""
+        self._last_tick = tick
+        with self.hass.data[DOMAIN][DOMAIN_STATS].timer("update", self.entity_id):
+            await self._async_update_states(tick, next_date)
+
+    async def _async_update_states(self, tick: UpdateTick, next_date) -> None:
+        """Update templates values, next date and state."""
+        stats = self.hass.data[DOMAIN][DOMAIN_STATS]
         # Update values from their templates.
         for property_name, template in self._templates_dict.items():
             try:
                 rendered_template = None
                 if template is not None:
-                    rendered_template = template.async_render()
+                    with stats.timer("render_template", self.entity_id):
+                        rendered_template = self.hass.data[DOMAIN][DOMAIN_TEMPLATES].async_render(
+                            template
+                        )
                 if rendered_template is not None:
-                    setattr(self, property_name, rendered_template)
+                    self._set_template_value(property_name, rendered_template)
             except TemplateError as ex:
-                friendly_property_name = property_name[1:].replace('_', ' ')
+                friendly_property_name = property_name.replace('_', ' ')
                 if ex.args and ex.args[0].startswith(
                         "UndefinedError: 'None' has no attribute"):
                     # Common during HA startup - so just a warning
@@ -421,24 +687,26 @@ class ReminderSensor(RestoreEntity):
                         ' the state is unknown.',
                         friendly_property_name, self._name)
                     continue
-                try:
-                    setattr(self, property_name, getattr(super(), property_name))
-                except AttributeError:
-                    _LOGGER.error('Could not render %s template %s: %s',
-                        friendly_property_name, self._name, ex)
+                _LOGGER.error('Could not render %s template %s: %s',
+                    friendly_property_name, self._name, ex)
         # Find next date
-        now_date = datetime.now().date()
-        next_date = await self.async_find_next_date(now_date)
+        now_date = tick.date
+        if next_date is _FIND_NEXT_DATE:
+            next_date = await self.async_find_next_date(now_date)
         if not next_date:
             self._state = STATE_OFF
             self._next_date = None
+            self._update_calendar()
+            self._update_snapshot(None)
             return
         # Set attributes
         self._next_date = datetime.combine(next_date, self.start_time)
         self._remaining = (self._next_date.date() - now_date).days
+        self._update_snapshot(next_date)
+        self._update_calendar()
         # Set state
         new_state = STATE_OFF
         if next_date and (next_date == now_date):
-            new_state = STATE_ON if self._is_time_in_range(datetime.now()) else STATE_OFF
+            new_state = STATE_ON if self._is_time_in_range(tick.time) else STATE_OFF
         if new_state != self._state:
             self._state = new_state
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""Persisted snapshot of reminders next dates."""
+
+import logging
+from datetime import date
+from itertools import islice
+from typing import Iterable, Optional
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.snapshot"
+STORAGE_VERSION = 1
+
+# Seconds to wait for more changes before saving
+SAVE_DELAY = 30
+# Number of upcoming occurrences kept by reminder
+LOOKAHEAD = 8
+
+# Next date of a restored reminder is unknown
+UNKNOWN = object()
+
+
+class ReminderSnapshot:
+    """Next dates of reminders, kept with their rule fingerprint across restarts.
+
+    Each entry holds the reminder upcoming occurrences (as day ordinals). Entry
+    is valid as long as its rule fingerprint is unchanged and it still has an
+    occurrence on or after the restore date, or it holds all the remaining
+    occurrences.
+    """
+
+    def __init__(self, hass):
+        """Initialize an empty snapshot."""
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._entries = {}
+
+    async def async_load(self) -> None:
+        """Load the snapshot saved by the last run."""
+        data = await self._store.async_load()
+        if data is not None:
+            self._entries = data.get("entries", {})
+        _LOGGER.debug("Loaded %d reminders snapshot entries", len(self._entries))
+
+    def get_next_date(self, entity_id: str, fingerprint: str, first_date: date):
+        """Returns stored next date on or after first_date, UNKNOWN if not stored."""
+        entry = self._entries.get(entity_id)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return UNKNOWN
+        first = first_date.toordinal()
+        for ordinal in entry["occurrences"]:
+            if ordinal >= first:
+                return date.fromordinal(ordinal)
+        # All occurrences passed, unknown unless there are no more
+        if len(entry["occurrences"]) == LOOKAHEAD:
+            return UNKNOWN
+        return None
+
+    @callback
+    def async_set(self, reminder, next_date: Optional[date]) -> None:
+        """Store reminder next date and upcoming occurrences, if changed."""
+        entry = self._entries.get(reminder.entity_id)
+        fingerprint = reminder.rule.fingerprint
+        ordinal = next_date.toordinal() if next_date else None
+        if (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and (entry["occurrences"] or [None])[0] == ordinal
+        ):
+            return
+        occurrences = []
+        if next_date is not None:
+            occurrences = [
+                occurrence.toordinal()
+                for occurrence in islice(reminder.iter_occurrences(next_date), LOOKAHEAD)
+            ]
+        self._entries[reminder.entity_id] = {
+            "fingerprint": fingerprint,
+            "occurrences": occurrences,
+        }
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_prune(self, entity_ids: Iterable[str]) -> None:
+        """Remove entries of reminders not in given entity IDs."""
+        entity_ids = set(entity_ids)
+        removed = [entity_id for entity_id in self._entries if entity_id not in entity_ids]
+        for entity_id in removed:
+            del self._entries[entity_id]
+        if removed:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Returns data to save."""
+        return {"entries": self._entries}
@@ -0,0 +1,120 @@
+"""Hot path statistics for reminders."""
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# Latency histogram buckets upper bounds, in milliseconds
+LATENCY_BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+
+class Latency:
+    """Latency counters and histogram of a single metric."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        """Initialize empty latency."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, duration: float) -> None:
+        """Record duration, in seconds."""
+        duration_ms = duration * 1000
+        self.count += 1
+        self.total += duration_ms
+        self.max = max(self.max, duration_ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration_ms)] += 1
+
+    def as_dict(self) -> dict:
+        """Return latency as dict (times in milliseconds)."""
+        histogram = {}
+        for bound, count in zip(LATENCY_BUCKETS + (None,), self.buckets):
+            if count:
+                histogram[f"<={bound}ms" if bound else f">{LATENCY_BUCKETS[-1]}ms"] = count
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max, 3),
+            "histogram": histogram,
+        }
+
+
+class ReminderStats:
+    """Counters and latencies, in total and by entity."""
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self._latencies = {}
+        self._counters = {}
+        self._entities = {}
+
+    def increment(self, name: str, entity_id: Optional[str] = None, count: int = 1) -> None:
+        """Increment named counter."""
+        self._counters[name] = self._counters.get(name, 0) + count
+        if entity_id is not None:
+            counters = self._entities.setdefault(entity_id, ({}, {}))[1]
+            counters[name] = counters.get(name, 0) + count
+
+    def record(self, name: str, duration: float, entity_id: Optional[str] = None) -> None:
+        """Record named latency, in seconds."""
+        if name not in self._latencies:
+            self._latencies[name] = Latency()
+        self._latencies[name].record(duration)
+        if entity_id is not None:
+            latencies = self._entities.setdefault(entity_id, ({}, {}))[0]
+            if name not in latencies:
+                latencies[name] = Latency()
+            latencies[name].record(duration)
+
+    @contextmanager
+    def timer(self, name: str, entity_id: Optional[str] = None):
+        """Record named latency of the context block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, entity_id)
+
+    def remove_entity(self, entity_id: str) -> None:
+        """Remove entity statistics."""
+        self._entities.pop(entity_id, None)
+
+    def reset(self) -> None:
+        """Remove all statistics."""
+        self._latencies.clear()
+        self._counters.clear()
+        self._entities.clear()
+
+    def as_dict(self, slowest: int = 10) -> dict:
+        """Return statistics, with the given number of slowest entities."""
+
+        def slowest_call(entity_id):
+            return max(
+                (latency.max for latency in self._entities[entity_id][0].values()),
+                default=0.0,
+            )
+
+        slowest_entities = sorted(self._entities, key=slowest_call, reverse=True)[:slowest]
+        return {
+            "counters": dict(self._counters),
+            "latencies": {
+                name: latency.as_dict() for name, latency in self._latencies.items()
+            },
+            "slowest": [
+                {
+                    "entity_id": entity_id,
+                    "max_ms": round(slowest_call(entity_id), 3),
+                    "counters": dict(self._entities[entity_id][1]),
+                    "latencies": {
+                        name: latency.as_dict()
+                        for name, latency in self._entities[entity_id][0].items()
+                    },
+                }
+                for entity_id in slowest_entities
+            ],
+        }
@@ -0,0 +1,101 @@
+"""Shared templates rendering for reminders."""
+
+import logging
+
+from homeassistant.const import MATCH_ALL
+from homeassistant.core import callback
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.event import async_track_state_change
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SharedTemplate:
+    """Template rendered once for all reminders using it."""
+
+    def __init__(self, hass, template, entity_ids):
+        """Initialize shared template, tracking its entities."""
+        self.template = template
+        self.listeners = []
+        self._result = None
+        self._error = None
+        self._rendered = False
+        self._unsub = async_track_state_change(
+            hass, entity_ids, self._async_entities_changed
+        )
+
+    def async_render(self):
+        """Returns template result, rendered only once per entities change."""
+        if not self._rendered:
+            try:
+                self._result = self.template.async_render()
+                self._error = None
+            except TemplateError as ex:
+                self._error = ex
+            self._rendered = True
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    @callback
+    def _async_entities_changed(self, entity_id, old_state, new_state):
+        """Render again on entities change, and notify listeners on new result."""
+        result, error = self._result, self._error
+        self._rendered = False
+        try:
+            self.async_render()
+        except TemplateError:
+            pass
+        if self._result == result and str(self._error) == str(error):
+            return
+        _LOGGER.debug("Template changed by %s: %s", entity_id, self.template.template)
+        for action in self.listeners:
+            action()
+
+    @callback
+    def async_stop(self):
+        """Stop tracking template entities."""
+        self._unsub()
+
+
+class SharedTemplates:
+    """Templates of all reminders, by template string."""
+
+    def __init__(self, hass):
+        """Initialize templates."""
+        self._hass = hass
+        self._templates = {}
+
+    @callback
+    def async_subscribe(self, template, action):
+        """Call action whenever template result changes.
+
+        Returns unsubscribe callback, or None if template entities can't be tracked.
+        """
+        shared = self._templates.get(template.template)
+        if shared is None:
+            entity_ids = template.extract_entities()
+            if entity_ids == MATCH_ALL:
+                return None
+            if not entity_ids:
+                # Static template never changes
+                return lambda: None
+            shared = SharedTemplate(self._hass, template, entity_ids)
+            self._templates[template.template] = shared
+        shared.listeners.append(action)
+
+        @callback
+        def async_unsubscribe():
+            shared.listeners.remove(action)
+            if not shared.listeners:
+                shared.async_stop()
+                del self._templates[template.template]
+
+        return async_unsubscribe
+
+    def async_render(self, template):
+        """Render template, sharing the result of tracked templates."""
+        shared = self._templates.get(template.template)
+        if shared is None:
+            return template.async_render()
+        return shared.async_render()
@@ -0,0 +1,19 @@
+"""Clock snapshot shared by reminders updated together."""
+
+from datetime import datetime
+from typing import Optional
+
+
+class UpdateTick:
+    """Local time, read once and shared by all reminders of an update batch."""
+
+    __slots__ = ("now", "date", "time")
+
+    def __init__(self, now: Optional[datetime] = None):
+        """Read the clock, unless a (local) time is given."""
+        self.now = now or datetime.now()
+        self.date = self.now.date()
+        self.time = self.now.time()
+
+    def __repr__(self):
+        return f"UpdateTick({self.now!r})"